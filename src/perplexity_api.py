@@ -11,6 +11,7 @@ sys.path.insert(0, current_dir)
 
 import asyncio
 import json
+import orjson
 import re
 import time
 from typing import Dict, List, Optional, Union, AsyncGenerator, Any
@@ -47,23 +48,58 @@ def load_cookies_from_env() -> Dict[str, str]:
     return {}
 
 
+# Parsed JSON files keyed by absolute path: (st_mtime_ns, st_size, data)
+_json_cache: Dict[str, tuple] = {}
+
+# spaces.json path that last yielded mappings, tried before the other candidates
+_spaces_path: Optional[str] = None
+
+
+def load_json_cached(path: str) -> Any:
+    """
+    Load a JSON file, reusing the parsed data while the file is unchanged on disk.
+
+    Callers must not mutate the returned object; it is shared between calls.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    cached = _json_cache.get(abs_path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers' handlers still apply
+    with open(abs_path, 'rb') as f:
+        data = orjson.loads(f.read())
+    _json_cache[abs_path] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
 def load_spaces_mapping() -> Dict[str, str]:
     """Load space name to UUID mappings from spaces.json"""
+    global _spaces_path
+
     possible_paths = [
         "spaces.json",  # Current directory
         "/app/spaces.json",  # Docker container path
         "../spaces.json",  # Parent directory
         "/home/mewtwo/Zykairotis/Perplexity-claude/spaces.json",  # Original path
     ]
+    if _spaces_path:
+        possible_paths.insert(0, _spaces_path)
 
     for spaces_path in possible_paths:
         try:
-            with open(spaces_path, 'r') as f:
-                spaces_data = json.load(f)
-                spaces = spaces_data.get('spaces', {})
-                if spaces:
+            spaces_data = load_json_cached(spaces_path)
+            spaces = spaces_data.get('spaces', {})
+            if spaces:
+                if spaces_path != _spaces_path:
                     print(f"✅ Loaded {len(spaces)} space mappings from {spaces_path}")
-                    return spaces
+                    _spaces_path = spaces_path
+                return dict(spaces)
         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
             continue
 
@@ -195,21 +231,23 @@ class PerplexityAPI:
     Provides both synchronous-style and streaming interfaces for Perplexity AI
     """
     
-    def __init__(self, cookies: Optional[Dict[str, str]] = None):
+    def __init__(self, cookies: Optional[Dict[str, str]] = None, max_clients: int = 10):
         """
         Initialize the API wrapper
 
         Args:
             cookies: Dictionary of cookies for authentication. If None, loads from environment.
+            max_clients: Maximum number of pooled connections kept by the HTTP session
         """
         self.cookies = cookies or load_cookies_from_env()
+        self.max_clients = max_clients
         self._client = None
         self._session_info = {}
     
     async def _get_client(self) -> Client:
         """Get or create the client instance"""
         if self._client is None:
-            self._client = await Client(self.cookies)
+            self._client = await Client(self.cookies, max_clients=self.max_clients)
         return self._client
     
     async def search(
@@ -547,6 +585,20 @@ class PerplexityAPI:
             'owns_account': getattr(client, 'own', False)
         }
     
+    async def ping(self, timeout: float = 3.0) -> int:
+        """
+        Send a HEAD request to perplexity.ai over the pooled session
+
+        Args:
+            timeout: Request timeout in seconds
+
+        Returns:
+            HTTP status code of the response
+        """
+        client = await self._get_client()
+        resp = await client.session.head('https://www.perplexity.ai/', timeout=timeout)
+        return resp.status_code
+    
     async def create_space(
         self,
         title: str,
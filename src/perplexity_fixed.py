@@ -36,11 +36,12 @@ class Client(AsyncMixin):
     '''
     A client for interacting with the Perplexity AI API.
     '''
-    async def __ainit__(self, cookies=None):
+    async def __ainit__(self, cookies=None, max_clients=10):
         # If no cookies provided, cookies must be passed explicitly
         if cookies is None:
             cookies = {}
-        self.session = requests.AsyncSession(headers={
+        # max_clients bounds the pool of reusable curl handles (and their connections)
+        self.session = requests.AsyncSession(max_clients=max_clients, headers={
             'accept': 'text/event-stream',
             'accept-encoding': 'gzip, deflate, br, zstd',
             'accept-language': 'en-US,en;q=0.5',
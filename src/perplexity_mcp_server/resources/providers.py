@@ -6,6 +6,7 @@ Implements specific providers for models, health status, etc.
 
 import logging
 import json
+import time
 from typing import Dict, Any
 from abc import ABC, abstractmethod
 
@@ -130,7 +131,6 @@ class HealthResourceProvider(BaseResourceProvider):
 
             self.last_status = response
 
-        import time
         self.last_check = time.time()
 
         return json.dumps(response, indent=2, default=str)
@@ -215,10 +215,6 @@ class SpacesResourceProvider(BaseResourceProvider):
     async def read(self, uri: str) -> str:
         """Read configured spaces."""
         try:
-            import sys
-            import os
-            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            
             from perplexity_api import load_spaces_mapping
             
             spaces = load_spaces_mapping()
@@ -6,24 +6,21 @@ A modular Model Context Protocol server that provides access to Perplexity AI
 search capabilities with proper separation of concerns and maintainable architecture.
 """
 
-import json
 import logging
 import sys
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 
-# Import server components
-import sys
-import os
-
-# Add parent directory to path for imports
-current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, current_dir)  # Add MCP server directory
-sys.path.insert(0, os.path.dirname(current_dir))  # Add src directory
+# Add src directory to path so `python -m src.perplexity_mcp_server.server` works
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
 
+# Import server components
 from perplexity_mcp_server.config.settings import load_config, ServerConfig
 from perplexity_mcp_server.tools import (
     search_perplexity,
@@ -35,7 +32,14 @@ from perplexity_mcp_server.tools import (
     create_perplexity_space,
     list_perplexity_spaces
 )
-from perplexity_mcp_server.resources import get_resource_manager, get_search_context, get_session_history
+from perplexity_mcp_server.resources import (
+    get_resource_manager,
+    get_search_context,
+    get_search_analytics,
+    get_trending_queries,
+    get_session_history,
+    get_session_analytics
+)
 from perplexity_mcp_server.resources.providers import (
     ModelsResourceProvider,
     HealthResourceProvider,
@@ -43,7 +47,8 @@ from perplexity_mcp_server.resources.providers import (
     ProfilesResourceProvider,
     SpacesResourceProvider
 )
-from perplexity_mcp_server.utils.perplexity_client import get_perplexity_api
+# Same module path the tools use, so cleanup closes the client they share
+from utils.perplexity_client import get_perplexity_api
 from perplexity_mcp_server.prompts import (
     search_workshop,
     consultation_session,
@@ -53,6 +58,11 @@ from perplexity_mcp_server.prompts import (
 )
 
 
+def _dump(obj: Any) -> str:
+    """Serialize a resource payload to a JSON string."""
+    return orjson.dumps(obj).decode()
+
+
 class PerplexityMCPServer:
     """Main Perplexity MCP Server class."""
 
@@ -138,19 +148,27 @@ class PerplexityMCPServer:
         self.resource_manager.register_provider("perplexity://config", config_provider)
         self.resource_manager.register_provider("perplexity://profiles", profiles_provider)
 
-        # Register resources with MCP
-        self.mcp.resource("perplexity://models")(self._get_models_resource)
-        self.mcp.resource("perplexity://health")(self._get_health_resource)
-        self.mcp.resource("perplexity://config")(self._get_config_resource)
-        self.mcp.resource("perplexity://profiles")(self._get_profiles_resource)
-        self.mcp.resource("perplexity://spaces")(self._get_spaces_resource)
-
-        # Register new dynamic resources
-        self.mcp.resource("perplexity://search/context")(self._get_search_context_resource)
-        self.mcp.resource("perplexity://search/analytics")(self._get_search_analytics_resource)
-        self.mcp.resource("perplexity://search/trending")(self._get_trending_queries_resource)
-        self.mcp.resource("perplexity://session/history")(self._get_session_history_resource)
-        self.mcp.resource("perplexity://session/analytics")(self._get_session_analytics_resource)
+        # Register resources with MCP; provider-backed URIs have no fetcher
+        resources = [
+            ("perplexity://models", "_get_models_resource", "models", None),
+            ("perplexity://health", "_get_health_resource", "health", None),
+            ("perplexity://config", "_get_config_resource", "config", None),
+            ("perplexity://profiles", "_get_profiles_resource", "profiles", None),
+            ("perplexity://spaces", "_get_spaces_resource", "spaces", None),
+            ("perplexity://search/context", "_get_search_context_resource",
+             "search context", get_search_context),
+            ("perplexity://search/analytics", "_get_search_analytics_resource",
+             "search analytics", get_search_analytics),
+            ("perplexity://search/trending", "_get_trending_queries_resource",
+             "trending queries", get_trending_queries),
+            ("perplexity://session/history", "_get_session_history_resource",
+             "session history", get_session_history),
+            ("perplexity://session/analytics", "_get_session_analytics_resource",
+             "session analytics", get_session_analytics),
+        ]
+
+        for uri, name, label, fetcher in resources:
+            self.mcp.resource(uri)(self._make_resource_handler(uri, name, label, fetcher))
 
         self.logger.info(f"Registered 10 resources")
 
@@ -185,88 +203,32 @@ class PerplexityMCPServer:
 
         self.logger.info(f"Registered 5 prompts")
 
-    async def _get_models_resource(self):
-        """Resource handler for models."""
-        try:
-            return await self.resource_manager.read_resource("perplexity://models")
-        except Exception as e:
-            self.logger.error(f"Error reading models resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_health_resource(self):
-        """Resource handler for health."""
-        try:
-            return await self.resource_manager.read_resource("perplexity://health")
-        except Exception as e:
-            self.logger.error(f"Error reading health resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_config_resource(self):
-        """Resource handler for config."""
-        try:
-            return await self.resource_manager.read_resource("perplexity://config")
-        except Exception as e:
-            self.logger.error(f"Error reading config resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_profiles_resource(self):
-        """Resource handler for profiles."""
-        try:
-            return await self.resource_manager.read_resource("perplexity://profiles")
-        except Exception as e:
-            self.logger.error(f"Error reading profiles resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_spaces_resource(self):
-        """Resource handler for spaces."""
-        try:
-            return await self.resource_manager.read_resource("perplexity://spaces")
-        except Exception as e:
-            self.logger.error(f"Error reading spaces resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_search_context_resource(self):
-        """Resource handler for search context."""
-        try:
-            return json.dumps(await get_search_context())
-        except Exception as e:
-            self.logger.error(f"Error reading search context resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_search_analytics_resource(self):
-        """Resource handler for search analytics."""
-        try:
-            from .resources.search_context_resource import get_search_analytics
-            return json.dumps(await get_search_analytics())
-        except Exception as e:
-            self.logger.error(f"Error reading search analytics resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_trending_queries_resource(self):
-        """Resource handler for trending queries."""
-        try:
-            from .resources.search_context_resource import get_trending_queries
-            return json.dumps(await get_trending_queries())
-        except Exception as e:
-            self.logger.error(f"Error reading trending queries resource: {e}")
-            return json.dumps({"error": str(e)})
-
-    async def _get_session_history_resource(self):
-        """Resource handler for session history."""
-        try:
-            return json.dumps(await get_session_history())
-        except Exception as e:
-            self.logger.error(f"Error reading session history resource: {e}")
-            return json.dumps({"error": str(e)})
+    def _make_resource_handler(self, uri: str, name: str, label: str, fetcher=None):
+        """
+        Build an MCP resource handler for a URI.
 
-    async def _get_session_analytics_resource(self):
-        """Resource handler for session analytics."""
-        try:
-            from .resources.session_history_resource import get_session_analytics
-            return json.dumps(await get_session_analytics())
-        except Exception as e:
-            self.logger.error(f"Error reading session analytics resource: {e}")
-            return json.dumps({"error": str(e)})
+        Args:
+            uri: Resource URI
+            name: Handler name exposed to FastMCP
+            label: Human-readable resource label used in logs
+            fetcher: Optional coroutine function returning the payload; when
+                omitted the URI is read through the resource manager
+
+        Returns:
+            Async resource handler
+        """
+        async def handler():
+            try:
+                if fetcher is None:
+                    return await self.resource_manager.read_resource(uri)
+                return _dump(await fetcher())
+            except Exception as e:
+                self.logger.error(f"Error reading {label} resource: {e}")
+                return _dump({"error": str(e)})
+
+        handler.__name__ = name
+        handler.__doc__ = f"Resource handler for {label}."
+        return handler
 
     def start(self):
         """Start the MCP server."""
@@ -12,7 +12,7 @@ from tools.search import search_perplexity
 from tools.chat import chat_with_perplexity
 from tools.file_analysis import analyze_file_with_perplexity
 from tools.utils import get_available_models, get_search_profiles, get_perplexity_health
-from tools.spaces import create_perplexity_space, list_perplexity_spaces
+from tools.spaces import create_perplexity_space, create_perplexity_spaces_batch, list_perplexity_spaces
 
 __all__ = [
     "search_perplexity",
@@ -22,5 +22,6 @@ __all__ = [
     "get_search_profiles",
     "get_perplexity_health",
     "create_perplexity_space",
+    "create_perplexity_spaces_batch",
     "list_perplexity_spaces"
 ]
\ No newline at end of file
@@ -3,14 +3,19 @@ Base classes and utilities for MCP tools.
 """
 
 import logging
-import json
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+import orjson
+
+from utils.profile_validator import validate_profile, list_available_profiles
 
 logger = logging.getLogger(__name__)
 
 
-class ToolResponse(BaseModel):
+@dataclass(frozen=True)
+class ToolResponse:
     """Standard response format for tools."""
     success: bool
     data: Optional[Any] = None
@@ -18,7 +23,8 @@ class ToolResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
-class ValidationResult(BaseModel):
+@dataclass(frozen=True)
+class ValidationResult:
     """Validation result for tool inputs."""
     is_valid: bool
     error_message: Optional[str] = None
@@ -29,25 +35,47 @@ class ValidationResult(BaseModel):
 VALID_MODELS = ["claude45sonnet", "claude45sonnetthinking", "gpt5", "gpt5thinking", "sonar"]
 VALID_SOURCES = ["web", "scholar", "social"]
 REQUIRED_MODE = "pro"
-
-
+VALID_MODELS_SET = frozenset(VALID_MODELS)
+VALID_MODELS_ERROR = f"Available models: {VALID_MODELS}"
+VALID_SOURCES_SET = frozenset(s.lower() for s in VALID_SOURCES)
+# Common spellings of each source mapped to its canonical lowercase name
+_SOURCE_CANON = {
+    variant: s.lower()
+    for s in VALID_SOURCES
+    for variant in (s.lower(), s.upper(), s.capitalize())
+}
+AVAILABLE_PROFILES = tuple(list_available_profiles().keys())
+PROFILE_ERROR_SUFFIX = f"Available profiles: {list(AVAILABLE_PROFILES)}"
+PROFILE_REQUIRED_ERROR = f"Profile is required. {PROFILE_ERROR_SUFFIX}"
+
+# Shared success results; the validators return these instead of new instances
+_MODEL_OK = {
+    m: ValidationResult(is_valid=True, normalized_data={"model": m}) for m in VALID_MODELS
+}
+_MODE_OK = ValidationResult(is_valid=True, normalized_data={"mode": REQUIRED_MODE})
+# Sources are stored as tuples so callers cannot mutate the shared results
+_DEFAULT_SOURCES_OK = ValidationResult(is_valid=True, normalized_data={"sources": ("web",)})
+
+
+@lru_cache(maxsize=16)
 def validate_model(model: Optional[str]) -> ValidationResult:
     """Validate model parameter."""
     if not model:
         return ValidationResult(
             is_valid=False,
-            error_message=f"Model is required. Available models: {VALID_MODELS}"
+            error_message=f"Model is required. {VALID_MODELS_ERROR}"
         )
 
-    if model not in VALID_MODELS:
+    if model not in VALID_MODELS_SET:
         return ValidationResult(
             is_valid=False,
-            error_message=f"Invalid model '{model}'. Available models: {VALID_MODELS}"
+            error_message=f"Invalid model '{model}'. {VALID_MODELS_ERROR}"
         )
 
-    return ValidationResult(is_valid=True, normalized_data={"model": model})
+    return _MODEL_OK[model]
 
 
+@lru_cache(maxsize=16)
 def validate_mode(mode: str) -> ValidationResult:
     """Validate mode parameter."""
     if mode != REQUIRED_MODE:
@@ -56,26 +84,73 @@ def validate_mode(mode: str) -> ValidationResult:
             error_message=f"Only '{REQUIRED_MODE}' mode is supported. Please use mode='{REQUIRED_MODE}'"
         )
 
-    return ValidationResult(is_valid=True, normalized_data={"mode": mode})
+    return _MODE_OK
 
 
 def validate_sources(sources: List[str]) -> ValidationResult:
     """Validate sources parameter."""
+    return _validate_sources_cached(tuple(sources) if sources else ())
+
+
+@lru_cache(maxsize=128)
+def _validate_sources_cached(sources: Tuple[str, ...]) -> ValidationResult:
+    """Validate a tuple of sources; results are cached and shared."""
     if not sources:
-        return ValidationResult(is_valid=True, normalized_data={"sources": ["web"]})
+        return _DEFAULT_SOURCES_OK
 
     # Filter valid sources
-    valid_sources_lower = [s.lower() for s in VALID_SOURCES]
     filtered_sources = []
 
     for source in sources:
-        if source.lower() in valid_sources_lower:
-            filtered_sources.append(source.lower())
+        # Only fall back to lower() for unusual casings
+        canonical = _SOURCE_CANON.get(source) or _SOURCE_CANON.get(source.lower())
+        if canonical:
+            filtered_sources.append(canonical)
 
     if not filtered_sources:
-        return ValidationResult(is_valid=True, normalized_data={"sources": ["web"]})
+        return _DEFAULT_SOURCES_OK
+
+    return ValidationResult(is_valid=True, normalized_data={"sources": tuple(filtered_sources)})
+
+
+def validate_common(
+    mode: str,
+    model: Optional[str],
+    profile: Optional[str],
+    raw_mode: bool = False
+) -> Tuple[Optional[str], Optional[object]]:
+    """
+    Validate the mode, model and profile shared by all Perplexity tools.
 
-    return ValidationResult(is_valid=True, normalized_data={"sources": filtered_sources})
+    Returns:
+        Tuple of (error_response, search_profile); error_response is None
+        when all parameters are valid
+    """
+    mode_validation = validate_mode(mode)
+    if not mode_validation.is_valid:
+        return create_error_response(mode_validation.error_message, raw_mode), None
+
+    model_validation = validate_model(model)
+    if not model_validation.is_valid:
+        return create_error_response(model_validation.error_message, raw_mode), None
+
+    # Validate profile (required)
+    if not profile:
+        return create_error_response(PROFILE_REQUIRED_ERROR, raw_mode), None
+
+    search_profile = validate_profile(profile)
+    if search_profile is None:
+        return create_error_response(
+            f"Invalid profile '{profile}'. {PROFILE_ERROR_SUFFIX}",
+            raw_mode
+        ), None
+
+    return None, search_profile
+
+
+def truncate_for_log(text: str, limit: int = 200) -> str:
+    """Cap a string at limit characters for logging."""
+    return text if len(text) <= limit else text[:limit] + "...<truncated>"
 
 
 def format_response(
@@ -89,21 +164,33 @@ def format_response(
             "data": data,
             "metadata": metadata or {}
         }
-        return json.dumps(response, indent=2, default=str)
+        return orjson.dumps(
+            response,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            default=str
+        ).decode()
     else:
         # Return clean text/answer
+        if isinstance(data, str):
+            return data
         if isinstance(data, dict) and "answer" in data:
             return data["answer"]
         return str(data)
 
 
+@lru_cache(maxsize=64)
+def _error_json(error_message: str) -> str:
+    """Encode an error payload; validator messages repeat, so results are cached."""
+    error_data = {
+        "error": error_message,
+        "success": False
+    }
+    return orjson.dumps(error_data, option=orjson.OPT_INDENT_2).decode()
+
+
 def create_error_response(error_message: str, raw_mode: bool = False) -> str:
     """Create standardized error response."""
     if raw_mode:
-        error_data = {
-            "error": error_message,
-            "success": False
-        }
-        return json.dumps(error_data, indent=2)
+        return _error_json(error_message)
     else:
-        return f"Error: {error_message}"
\ No newline at end of file
+        return "Error: " + error_message
@@ -9,11 +9,11 @@ from typing import Optional
 from mcp.server.fastmcp import FastMCP
 
 from .base import (
-    validate_model, validate_mode,
+    validate_common,
     format_response, create_error_response
 )
 from utils.perplexity_client import get_perplexity_api
-from utils.profile_validator import validate_profile
+from perplexity_api import SearchMode, SearchSource
 
 logger = logging.getLogger(__name__)
 
@@ -82,49 +82,19 @@ async def chat_with_perplexity(
         Clean text response (default) or full JSON with conversation context and metadata.
     """
     try:
-        logger.info(f"Chatting with Perplexity: {message}")
+        logger.info("Chatting with Perplexity: %s", message)
 
         # Validate required parameters
-        mode_validation = validate_mode(mode)
-        if not mode_validation.is_valid:
-            return create_error_response(mode_validation.error_message, raw_mode)
-
-        model_validation = validate_model(model)
-        if not model_validation.is_valid:
-            return create_error_response(model_validation.error_message, raw_mode)
-
-        # Validate profile (required)
-        if not profile:
-            from utils.profile_validator import list_available_profiles
-            available_profiles = list(list_available_profiles().keys())
-            return create_error_response(
-                f"Profile is required. Available profiles: {available_profiles}",
-                raw_mode
-            )
-
-        search_profile = validate_profile(profile)
-        if search_profile is None:
-            from utils.profile_validator import list_available_profiles
-            available_profiles = list(list_available_profiles().keys())
-            return create_error_response(
-                f"Invalid profile '{profile}'. Available profiles: {available_profiles}",
-                raw_mode
-            )
+        error_response, search_profile = validate_common(mode, model, profile, raw_mode)
+        if error_response:
+            return error_response
 
         # Get API client
         client_manager = get_perplexity_api()
         api = await client_manager.get_client()
 
-        # Convert modes to enums
-        from perplexity_api import SearchMode, SearchSource
-        mode_mapping = {
-            "auto": SearchMode.AUTO,
-            "pro": SearchMode.PRO,
-            "reasoning": SearchMode.REASONING,
-            "deep research": SearchMode.DEEP_RESEARCH
-        }
-
-        search_mode = mode_mapping.get(mode, SearchMode.AUTO)
+        # validate_common only accepts "pro"
+        search_mode = SearchMode.PRO
 
         # For chat, we'll use the search method but treat it as a conversation
         result = await api.search(
@@ -144,6 +114,7 @@ async def chat_with_perplexity(
 
         # Format response
         if raw_mode:
+            sources = result.sources or []
             response_data = {
                 "message": message,
                 "response": result.answer,
@@ -152,9 +123,9 @@ async def chat_with_perplexity(
                 "model": result.model,
                 "model_used": model,
                 "timestamp": result.timestamp,
-                "sources": result.sources or [],
-                "profile": search_profile.value if search_profile else None,
-                "sources_count": len(result.sources) if result.sources else 0,
+                "sources": sources,
+                "profile": search_profile.value,
+                "sources_count": len(sources),
                 "temperature": temperature,
                 "prompt_source": prompt_source,
                 "query_source": query_source,
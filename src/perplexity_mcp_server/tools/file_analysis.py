@@ -9,14 +9,18 @@ from typing import Optional
 from mcp.server.fastmcp import FastMCP
 
 from .base import (
-    validate_model, validate_mode,
+    validate_common, truncate_for_log,
     format_response, create_error_response
 )
 from utils.perplexity_client import get_perplexity_api
-from utils.profile_validator import validate_profile
+from perplexity_api import SearchMode, SearchSource
 
 logger = logging.getLogger(__name__)
 
+_ANALYSIS_PROMPT_SUFFIX = (
+    "\n\nPlease provide a comprehensive analysis of this file content based on the request."
+)
+
 
 async def analyze_file_with_perplexity(
     file_content: str,
@@ -79,60 +83,27 @@ async def analyze_file_with_perplexity(
         Clean text analysis (default) or structured report with insights and metadata.
     """
     try:
-        logger.info(f"Analyzing file with Perplexity: {query}")
+        logger.info("Analyzing file with Perplexity: %s", truncate_for_log(query))
 
         # Validate required parameters
-        mode_validation = validate_mode(mode)
-        if not mode_validation.is_valid:
-            return create_error_response(mode_validation.error_message, raw_mode)
-
-        model_validation = validate_model(model)
-        if not model_validation.is_valid:
-            return create_error_response(model_validation.error_message, raw_mode)
-
-        # Validate profile (required)
-        if not profile:
-            from utils.profile_validator import list_available_profiles
-            available_profiles = list(list_available_profiles().keys())
-            return create_error_response(
-                f"Profile is required. Available profiles: {available_profiles}",
-                raw_mode
-            )
-
-        search_profile = validate_profile(profile)
-        if search_profile is None:
-            from utils.profile_validator import list_available_profiles
-            available_profiles = list(list_available_profiles().keys())
-            return create_error_response(
-                f"Invalid profile '{profile}'. Available profiles: {available_profiles}",
-                raw_mode
-            )
+        error_response, search_profile = validate_common(mode, model, profile, raw_mode)
+        if error_response:
+            return error_response
 
         # Get API client
         client_manager = get_perplexity_api()
         api = await client_manager.get_client()
 
-        # Convert modes to enums
-        from perplexity_api import SearchMode, SearchSource
-        mode_mapping = {
-            "auto": SearchMode.AUTO,
-            "pro": SearchMode.PRO,
-            "reasoning": SearchMode.REASONING,
-            "deep research": SearchMode.DEEP_RESEARCH
-        }
-
-        search_mode = mode_mapping.get(mode, SearchMode.AUTO)
-
-        # Create analysis prompt
-        analysis_prompt = f"""
-        File Type: {file_type}
-        Analysis Request: {query}
-
-        File Content:
-        {file_content}
+        # validate_common only accepts "pro"
+        search_mode = SearchMode.PRO
 
-        Please provide a comprehensive analysis of this file content based on the request.
-        """
+        # Create analysis prompt in a single join so file_content is copied once
+        analysis_prompt = "".join((
+            "File Type: ", file_type,
+            "\nAnalysis Request: ", query,
+            "\n\nFile Content:\n", file_content,
+            _ANALYSIS_PROMPT_SUFFIX
+        ))
 
         # Perform analysis
         result = await api.search(
@@ -152,6 +123,7 @@ async def analyze_file_with_perplexity(
 
         # Format response
         if raw_mode:
+            sources = result.sources or []
             response_data = {
                 "file_type": file_type,
                 "analysis_request": query,
@@ -160,9 +132,9 @@ async def analyze_file_with_perplexity(
                 "model": result.model,
                 "model_used": model,
                 "timestamp": result.timestamp,
-                "sources": result.sources or [],
-                "profile": search_profile.value if search_profile else None,
-                "sources_count": len(result.sources) if result.sources else 0,
+                "sources": sources,
+                "profile": search_profile.value,
+                "sources_count": len(sources),
                 "prompt_source": prompt_source,
                 "query_source": query_source,
                 "should_ask_for_mcp_tool_confirmation": should_ask_for_mcp_tool_confirmation,
@@ -5,18 +5,31 @@ Provides search functionality using Perplexity AI's models with profile enhancem
 """
 
 import logging
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from mcp.server.fastmcp import FastMCP
 
 from .base import (
-    validate_model, validate_mode, validate_sources,
+    validate_common, validate_sources,
     format_response, create_error_response
 )
 from utils.perplexity_client import get_perplexity_api
-from utils.profile_validator import validate_profile
+from perplexity_api import SearchMode, SearchSource
 
 logger = logging.getLogger(__name__)
 
+_SOURCE_MAPPING = {
+    "web": SearchSource.WEB,
+    "scholar": SearchSource.SCHOLAR,
+    "social": SearchSource.SOCIAL
+}
+
+
+@lru_cache(maxsize=16)
+def _to_search_sources(sources: Tuple[str, ...]) -> Tuple[SearchSource, ...]:
+    """Convert normalized source names to SearchSource enums."""
+    return tuple(_SOURCE_MAPPING[source] for source in sources)
+
 
 async def search_perplexity(
     query: str,
@@ -84,34 +97,12 @@ async def search_perplexity(
         Clean text/markdown answer (default) or full JSON response with sources and metadata.
     """
     try:
-        logger.info(f"Searching Perplexity: {query}")
+        logger.info("Searching Perplexity: %s", query)
 
         # Validate required parameters
-        mode_validation = validate_mode(mode)
-        if not mode_validation.is_valid:
-            return create_error_response(mode_validation.error_message, raw_mode)
-
-        model_validation = validate_model(model)
-        if not model_validation.is_valid:
-            return create_error_response(model_validation.error_message, raw_mode)
-
-        # Validate profile (required)
-        if not profile:
-            from utils.profile_validator import list_available_profiles
-            available_profiles = list(list_available_profiles().keys())
-            return create_error_response(
-                f"Profile is required. Available profiles: {available_profiles}",
-                raw_mode
-            )
-
-        search_profile = validate_profile(profile)
-        if search_profile is None:
-            from utils.profile_validator import list_available_profiles
-            available_profiles = list(list_available_profiles().keys())
-            return create_error_response(
-                f"Invalid profile '{profile}'. Available profiles: {available_profiles}",
-                raw_mode
-            )
+        error_response, search_profile = validate_common(mode, model, profile, raw_mode)
+        if error_response:
+            return error_response
 
         # Validate sources
         sources_validation = validate_sources(sources)
@@ -123,27 +114,10 @@ async def search_perplexity(
         api = await client_manager.get_client()
 
         # Convert sources to enum format
-        from perplexity_api import SearchSource
-        source_mapping = {
-            "web": SearchSource.WEB,
-            "scholar": SearchSource.SCHOLAR,
-            "social": SearchSource.SOCIAL
-        }
-
-        search_sources = []
-        for source in sources_validation.normalized_data["sources"]:
-            search_sources.append(source_mapping[source])
-
-        # Convert mode to enum
-        from perplexity_api import SearchMode
-        mode_mapping = {
-            "auto": SearchMode.AUTO,
-            "pro": SearchMode.PRO,
-            "reasoning": SearchMode.REASONING,
-            "deep research": SearchMode.DEEP_RESEARCH
-        }
-
-        search_mode = mode_mapping.get(mode, SearchMode.AUTO)
+        search_sources = _to_search_sources(sources_validation.normalized_data["sources"])
+
+        # validate_common only accepts "pro"
+        search_mode = SearchMode.PRO
 
         # Perform search with profile
         result = await api.search(
@@ -163,6 +137,10 @@ async def search_perplexity(
 
         # Format response
         if raw_mode:
+            sources = result.sources or []
+            sources_count = len(sources)
+            if sources_count > max_results:
+                sources = sources[:max_results]
             response_data = {
                 "query": result.query,
                 "answer": result.answer,
@@ -170,11 +148,11 @@ async def search_perplexity(
                 "model": result.model,
                 "model_used": model,
                 "language": result.language,
-                "sources": result.sources[:max_results] if result.sources else [],
+                "sources": sources,
                 "timestamp": result.timestamp,
                 "related_queries": result.related_queries or [],
-                "profile": search_profile.value if search_profile else None,
-                "sources_count": len(result.sources) if result.sources else 0,
+                "profile": search_profile.value,
+                "sources_count": sources_count,
                 "prompt_source": prompt_source,
                 "query_source": query_source,
                 "should_ask_for_mcp_tool_confirmation": should_ask_for_mcp_tool_confirmation,
@@ -4,18 +4,23 @@ Space/Collection Management Tools for Perplexity MCP Server.
 Provides tools for creating and managing Perplexity spaces (collections).
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from typing import Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 import logging
 
 from utils.perplexity_client import get_perplexity_api
+from perplexity_api import load_spaces_mapping
 
 
 logger = logging.getLogger(__name__)
 
+# Space fields copied from the API response, in response order
+_SPACE_FIELDS = ('uuid', 'title', 'slug', 'description', 'instructions', 'emoji', 'access')
+_SPACE_COUNT_FIELDS = ('thread_count', 'page_count', 'file_count')
+
+# Upper bound on space creations in flight at once during a batch
+BATCH_CONCURRENCY = 10
+
 
 async def create_perplexity_space(
     title: str,
@@ -23,7 +28,8 @@ async def create_perplexity_space(
     emoji: str = "",
     instructions: str = "",
     access: int = 1,
-    auto_save: bool = True
+    auto_save: bool = True,
+    include_full_response: bool = False
 ) -> dict:
     """
     Create a new Perplexity space/collection.
@@ -42,6 +48,7 @@ async def create_perplexity_space(
                      This defines how the agent should behave and respond within the space context.
         access: Access level (1 = private, 2 = team, 3 = public) - default is 1 (private)
         auto_save: If True, automatically save the space UUID to spaces.json for easy reference
+        include_full_response: If True, also return the raw API response under full_response
 
     Returns:
         Dictionary containing:
@@ -49,7 +56,7 @@ async def create_perplexity_space(
         - uuid: Unique identifier for the created space
         - title: Space name
         - slug: URL-friendly identifier
-        - full_response: Complete API response with all space details
+        - full_response: Complete API response with all space details (only if include_full_response)
 
     Example:
         # Create a trading analysis space
@@ -62,7 +69,7 @@ async def create_perplexity_space(
         )
         # Returns: {'success': True, 'uuid': 'ca8b447a-4d33-4936-a3e5-a9d31b789cb3', ...}
     """
-    logger.info(f"Creating new Perplexity space: {title}")
+    logger.info("Creating new Perplexity space: %s", title)
     
     try:
         api_manager = get_perplexity_api()
@@ -77,27 +84,19 @@ async def create_perplexity_space(
             auto_save=auto_save
         )
         
-        logger.info(f"Successfully created space: {title} (UUID: {result.get('uuid')})")
+        logger.info("Successfully created space: %s (UUID: %s)", title, result.get('uuid'))
         
-        return {
-            "success": True,
-            "uuid": result.get('uuid'),
-            "title": result.get('title'),
-            "slug": result.get('slug'),
-            "description": result.get('description'),
-            "instructions": result.get('instructions'),
-            "emoji": result.get('emoji'),
-            "access": result.get('access'),
-            "thread_count": result.get('thread_count', 0),
-            "page_count": result.get('page_count', 0),
-            "file_count": result.get('file_count', 0),
-            "owner": result.get('owner_user', {}).get('username'),
-            "auto_saved": auto_save,
-            "full_response": result
-        }
+        response = {"success": True}
+        response.update({key: result.get(key) for key in _SPACE_FIELDS})
+        response.update({key: result.get(key, 0) for key in _SPACE_COUNT_FIELDS})
+        response["owner"] = (result.get('owner_user') or {}).get('username')
+        response["auto_saved"] = auto_save
+        if include_full_response:
+            response["full_response"] = result
+        return response
         
     except Exception as e:
-        logger.error(f"Failed to create space '{title}': {str(e)}")
+        logger.error("Failed to create space '%s': %s", title, e)
         return {
             "success": False,
             "error": str(e),
@@ -105,6 +104,43 @@ async def create_perplexity_space(
         }
 
 
+async def create_perplexity_spaces_batch(
+    items: List[Dict[str, Any]],
+    concurrency: int = BATCH_CONCURRENCY
+) -> List[dict]:
+    """
+    Create several Perplexity spaces concurrently.
+
+    Args:
+        items: Keyword arguments for create_perplexity_space, one dict per space
+        concurrency: Maximum number of creations in flight at once
+
+    Returns:
+        List of create_perplexity_space results, in the same order as items.
+        An item that raises (e.g. missing title) yields a failure dict instead.
+
+    Example:
+        results = await create_perplexity_spaces_batch([
+            {"title": "Trading Analysis", "emoji": "📊"},
+            {"title": "Research Notes"}
+        ])
+    """
+    logger.info("Creating %d Perplexity spaces (concurrency=%d)", len(items), concurrency)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _create_one(item: Dict[str, Any]) -> dict:
+        async with sem:
+            return await create_perplexity_space(**item)
+
+    results = await asyncio.gather(*(_create_one(item) for item in items), return_exceptions=True)
+
+    return [
+        {"success": False, "error": str(result), "title": item.get('title')}
+        if isinstance(result, Exception) else result
+        for item, result in zip(items, results)
+    ]
+
+
 async def list_perplexity_spaces() -> dict:
     """
     List all configured Perplexity spaces from spaces.json.
@@ -121,15 +157,6 @@ async def list_perplexity_spaces() -> dict:
     logger.info("Listing configured Perplexity spaces")
     
     try:
-        # Import here to avoid circular dependencies
-        import sys
-        import os
-        parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        if parent_dir not in sys.path:
-            sys.path.insert(0, parent_dir)
-        
-        from perplexity_api import load_spaces_mapping
-        
         spaces = load_spaces_mapping()
         
         return {
@@ -139,7 +166,7 @@ async def list_perplexity_spaces() -> dict:
         }
         
     except Exception as e:
-        logger.error(f"Failed to list spaces: {str(e)}")
+        logger.error("Failed to list spaces: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -4,9 +4,12 @@ Utility tools for Perplexity MCP server.
 Provides helper tools for model information, profiles, and health checks.
 """
 
+import asyncio
 import logging
-import json
-from typing import Dict, Any
+import time
+import orjson
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from mcp.server.fastmcp import FastMCP
 
 from .base import format_response, create_error_response
@@ -15,6 +18,64 @@ from utils.profile_validator import list_available_profiles
 
 logger = logging.getLogger(__name__)
 
+# Health reports are reused for this many seconds so monitoring bursts hit the cache
+_HEALTH_TTL = 10.0
+_health_cache: Optional[Tuple[float, str]] = None
+# Upper bound on a whole health check, including cold client setup
+_HEALTH_TIMEOUT = 5.0
+
+
+def _dumps(obj: Any) -> str:
+    """Pretty-print a tool payload as JSON."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+
+
+# Tool payloads below never change at runtime, so they are serialized once
+_MODELS_JSON = _dumps({
+    "models": {
+        "claude45sonnet": {
+            "description": "Balanced reasoning and explanation",
+            "use_case": "General purpose analysis and explanation"
+        },
+        "claude45sonnetthinking": {
+            "description": "Advanced logical reasoning",
+            "use_case": "Complex logical problems and step-by-step analysis"
+        },
+        "gpt5": {
+            "description": "Deep analytical research",
+            "use_case": "Comprehensive research and detailed analysis"
+        },
+        "gpt5thinking": {
+            "description": "Complex reasoning and critical synthesis",
+            "use_case": "Advanced analytical thinking and problem-solving"
+        },
+        "sonar": {
+            "description": "Fast, efficient factual lookups",
+            "use_case": "Quick factual answers and simple queries"
+        }
+    },
+    "mode": "pro",
+    "required_profile": True,
+    "required_sources": ["web", "scholar", "social"]
+})
+
+
+@lru_cache(maxsize=1)
+def _profiles_json() -> str:
+    """Serialize the profile catalog on first use."""
+    response = {
+        "profiles": list_available_profiles(),
+        "usage": "Add the profile parameter to any search function to enhance query effectiveness",
+        "examples": {
+            "research": "search_perplexity(query='blockchain technology', profile='research')",
+            "code_analysis": "search_perplexity(query='React hooks optimization', profile='code_analysis')",
+            "troubleshooting": "search_perplexity(query='Docker connection issues', profile='troubleshooting')"
+        },
+        "integration": "Profiles work with search_perplexity, chat_with_perplexity, and analyze_file_with_perplexity"
+    }
+
+    return _dumps(response)
+
 
 async def get_available_models() -> str:
     """
@@ -30,42 +91,7 @@ async def get_available_models() -> str:
     **Returns:**
         Model list with descriptions and use cases
     """
-    try:
-        models = {
-            "claude45sonnet": {
-                "description": "Balanced reasoning and explanation",
-                "use_case": "General purpose analysis and explanation"
-            },
-            "claude45sonnetthinking": {
-                "description": "Advanced logical reasoning",
-                "use_case": "Complex logical problems and step-by-step analysis"
-            },
-            "gpt5": {
-                "description": "Deep analytical research",
-                "use_case": "Comprehensive research and detailed analysis"
-            },
-            "gpt5thinking": {
-                "description": "Complex reasoning and critical synthesis",
-                "use_case": "Advanced analytical thinking and problem-solving"
-            },
-            "sonar": {
-                "description": "Fast, efficient factual lookups",
-                "use_case": "Quick factual answers and simple queries"
-            }
-        }
-
-        response = {
-            "models": models,
-            "mode": "pro",
-            "required_profile": True,
-            "required_sources": ["web", "scholar", "social"]
-        }
-
-        return json.dumps(response, indent=2)
-
-    except Exception as e:
-        logger.error(f"Error getting models: {e}")
-        return create_error_response(f"Error getting models: {str(e)}", raw_mode=True)
+    return _MODELS_JSON
 
 
 async def get_search_profiles() -> str:
@@ -78,26 +104,33 @@ async def get_search_profiles() -> str:
     Complete profile catalog with descriptions, use cases, and examples for coding and tech work
     """
     try:
-        profiles = list_available_profiles()
-
-        response = {
-            "profiles": profiles,
-            "usage": "Add the profile parameter to any search function to enhance query effectiveness",
-            "examples": {
-                "research": "search_perplexity(query='blockchain technology', profile='research')",
-                "code_analysis": "search_perplexity(query='React hooks optimization', profile='code_analysis')",
-                "troubleshooting": "search_perplexity(query='Docker connection issues', profile='troubleshooting')"
-            },
-            "integration": "Profiles work with search_perplexity, chat_with_perplexity, and analyze_file_with_perplexity"
-        }
-
-        return json.dumps(response, indent=2)
+        return _profiles_json()
 
     except Exception as e:
         logger.error(f"Error getting profiles: {e}")
         return create_error_response(f"Error getting profiles: {str(e)}", raw_mode=True)
 
 
+async def _probe_health() -> Dict[str, Any]:
+    """Ping perplexity.ai over the pooled session and build the health report."""
+    client_manager = get_perplexity_api()
+    api = await client_manager.get_client()
+
+    # A HEAD request proves connectivity without spending a search
+    start = time.perf_counter()
+    status_code = await api.ping(timeout=3.0)
+    latency_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    return {
+        "status": "healthy" if status_code < 500 else "unhealthy",
+        "connection": "connected",
+        "api_working": status_code < 500,
+        "http_status": status_code,
+        "latency_ms": latency_ms,
+        "cookies_loaded": bool(api.cookies)
+    }
+
+
 async def get_perplexity_health() -> str:
     """
     🔍 Check Perplexity API connection health and system status.
@@ -105,43 +138,38 @@ async def get_perplexity_health() -> str:
     **Perfect for:** Connection diagnostics, performance monitoring, troubleshooting, API status verification
 
     **Health Checks Include:**
-    • API connection status and latency
-    • Model availability and response times
-    • Authentication and authorization status
-    • Rate limiting and quota information
-    • System-wide performance metrics
+    • A HEAD ping to perplexity.ai over the pooled client session (no search is spent)
+    • HTTP status and round-trip latency of that ping
+    • Whether authentication cookies are loaded
+
+    **Status Values:**
+    • healthy: the ping answered with a non-5xx status
+    • unhealthy: the ping returned a 5xx status or the connection failed
+    • degraded: the whole check ran past its 5 second limit
+
+    Reports are cached for 10 seconds, so repeated calls within that window return the same result.
 
     **Returns:**
-    Comprehensive health report with connection status, performance metrics, and diagnostic information
+    JSON health report with status, connection, api_working, http_status, latency_ms and cookies_loaded,
+    or an error message when the check fails or times out
     """
+    global _health_cache
+
+    now = time.monotonic()
+    if _health_cache is not None and now - _health_cache[0] < _HEALTH_TTL:
+        return _health_cache[1]
+
     try:
-        # Get API client
-        client_manager = get_perplexity_api()
-        api = await client_manager.get_client()
-
-        # Try a simple test search
-        from perplexity_api import SearchMode, SearchSource
-        result = await api.search(
-            query="test",
-            mode=SearchMode.AUTO,
-            sources=[SearchSource.WEB],
-            language="english"
-        )
+        response = await asyncio.wait_for(_probe_health(), _HEALTH_TIMEOUT)
 
+    except asyncio.TimeoutError:
         response = {
-            "status": "healthy",
-            "connection": "connected",
-            "api_working": True,
-            "test_result": {
-                "query": result.query,
-                "answer_length": len(result.answer) if result.answer else 0,
-                "mode": result.mode,
-                "timestamp": result.timestamp
-            }
+            "status": "degraded",
+            "connection": "timeout",
+            "api_working": False,
+            "error": f"Health check exceeded {_HEALTH_TIMEOUT:g}s"
         }
 
-        return json.dumps(response, indent=2, default=str)
-
     except Exception as e:
         response = {
             "status": "unhealthy",
@@ -150,4 +178,6 @@ async def get_perplexity_health() -> str:
             "error": str(e)
         }
 
-        return json.dumps(response, indent=2, default=str)
\ No newline at end of file
+    payload = _dumps(response)
+    _health_cache = (now, payload)
+    return payload
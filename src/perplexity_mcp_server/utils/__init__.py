@@ -4,6 +4,15 @@ Utility modules for Perplexity MCP server.
 Provides client management, profile validation, and other shared utilities.
 """
 
+import os
+import sys
+
+# Make the top-level src modules (perplexity_api, perplexity_profiles) importable
+# once for the whole package, before any submodule needs them
+_src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _src_dir not in sys.path:
+    sys.path.insert(0, _src_dir)
+
 from .perplexity_client import get_perplexity_api, PerplexityClientManager
 from .profile_validator import validate_profile, list_available_profiles
 
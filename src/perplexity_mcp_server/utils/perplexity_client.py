@@ -4,68 +4,89 @@ Perplexity API client management.
 Handles API client creation, caching, and session management.
 """
 
+import asyncio
+import json
 import logging
 from typing import Dict, Optional
-import sys
 import os
 
+from perplexity_api import PerplexityAPI, load_json_cached
+
 logger = logging.getLogger(__name__)
 
-# Add the src directory to Python path for imports
-current_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-if current_dir not in sys.path:
-    sys.path.insert(0, current_dir)
+# Candidate locations for cookies.json, in probe order
+_COOKIE_PATHS = (
+    "cookies.json",  # Current directory
+    "/app/cookies.json",  # Docker container path
+    "../cookies.json",  # Parent directory
+    "../../cookies.json",  # Project root
+    "/home/mewtwo/Zykairotis/Perplexity-claude/cookies.json",  # Original path
+)
 
 
 class PerplexityClientManager:
     """Manages Perplexity API client instances."""
 
-    def __init__(self):
+    def __init__(self, max_clients: int = 20):
+        """
+        Initialize the client manager.
+
+        Args:
+            max_clients: Size of the connection pool shared by all tool calls
+        """
+        self.max_clients = max_clients
         self._client = None
         self._cookies = None
+        self._cookie_path = None
+        # Created lazily: the manager is instantiated at import, before any event loop runs
+        self._init_lock = None
 
     def load_cookies_from_env(self) -> Dict[str, str]:
         """Load cookies from JSON file path specified in environment."""
-        cookies = {}
-
-        # Try multiple possible paths for cookies.json
-        possible_paths = [
-            "cookies.json",  # Current directory
-            "/app/cookies.json",  # Docker container path
-            "../cookies.json",  # Parent directory
-            "../../cookies.json",  # Project root
-            "/home/mewtwo/Zykairotis/Perplexity-claude/cookies.json",  # Original path
-        ]
-
-        for cookie_path in possible_paths:
-            try:
-                import json
-                with open(cookie_path, 'r') as f:
-                    cookie_data = json.load(f)
-                    cookies = cookie_data.get('cookies', {})
-                    if cookies:
-                        logger.info(f"✅ Loaded {len(cookies)} cookies from {cookie_path}")
-                        self._cookies = cookies
-                        return cookies
-                    else:
-                        logger.warning(f"⚠️ No cookies found in {cookie_path}")
-            except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
-                continue
-
-        logger.warning(f"⚠️ Could not load cookies from any of the attempted paths: {possible_paths}")
+        # Try the path that worked last time before probing the others
+        if self._cookie_path:
+            cookies = self._read_cookies(self._cookie_path)
+            if cookies:
+                self._cookies = cookies
+                return self._cookies
+
+        # Only open candidates that exist, rather than catching FileNotFoundError per miss
+        for cookie_path in filter(os.path.exists, _COOKIE_PATHS):
+            cookies = self._read_cookies(cookie_path)
+            if cookies:
+                if cookie_path != self._cookie_path:
+                    logger.info("✅ Loaded %d cookies from %s", len(cookies), cookie_path)
+                    self._cookie_path = cookie_path
+                self._cookies = cookies
+                return self._cookies
+            logger.warning("⚠️ No cookies found in %s", cookie_path)
+
+        self._cookie_path = None
+        logger.warning("⚠️ Could not load cookies from any of the attempted paths: %s", list(_COOKIE_PATHS))
         return {}
 
+    @staticmethod
+    def _read_cookies(cookie_path: str) -> Dict[str, str]:
+        """Read the cookies mapping from a cookies.json file, or {} if unreadable."""
+        try:
+            return dict(load_json_cached(cookie_path).get('cookies', {}))
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return {}
+
     async def get_client(self):
         """Get or create the Perplexity API client."""
-        if self._client is None:
-            # Import from the original codebase
-            try:
-                from perplexity_api import PerplexityAPI
-                cookies = self.load_cookies_from_env()
-                self._client = PerplexityAPI(cookies)
-            except ImportError as e:
-                logger.error(f"Failed to import PerplexityAPI: {e}")
-                raise RuntimeError("Could not import PerplexityAPI from src directory")
+        if self._client is not None:
+            return self._client
+
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+
+        async with self._init_lock:
+            # Another coroutine may have created the client while we waited
+            if self._client is None:
+                # Cookie file reads are blocking, so keep them off the event loop
+                cookies = await asyncio.to_thread(self.load_cookies_from_env)
+                self._client = PerplexityAPI(cookies, max_clients=self.max_clients)
 
         return self._client
 
@@ -75,6 +96,13 @@ class PerplexityClientManager:
             await self._client.close()
         self._client = None
 
+    async def __aenter__(self):
+        await self.get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
 
 # Global client manager instance
 _client_manager = PerplexityClientManager()
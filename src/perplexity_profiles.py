@@ -3,7 +3,8 @@ Perplexity Search Profiles
 Specialized profiles for enhancing search effectiveness for coding and tech-related work
 """
 
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Optional, Union
 from enum import Enum
 
 class SearchProfile(Enum):
@@ -57,31 +58,40 @@ PROFILE_INSTRUCTIONS = {
     SearchProfile.OPTIMIZATION: "suggest specific optimizations, performance tuning strategies, resource usage improvements, and measurable enhancement techniques"
 }
 
+# Read-only: the lookup tables below are derived from it once at import
+PROFILE_INSTRUCTIONS = MappingProxyType(PROFILE_INSTRUCTIONS)
+
+# Same instructions keyed by profile name, so lookups skip enum construction and hashing
+_INSTRUCTIONS_BY_NAME = MappingProxyType({profile.value: instruction for profile, instruction in PROFILE_INSTRUCTIONS.items()})
+
+# Text appended to a query, keyed by SearchProfile, profile name and None, so applying
+# a profile is a single lookup; None and profiles without instructions map to ""
+_SUFFIX_BY_KEY = {None: ""}
+for _profile, _instruction in PROFILE_INSTRUCTIONS.items():
+    _SUFFIX_BY_KEY[_profile] = _SUFFIX_BY_KEY[_profile.value] = ". " + _instruction if _instruction else ""
+del _profile, _instruction
+
 def get_profile_instruction(profile: SearchProfile) -> str:
     """Get the instruction string for a specific profile"""
     return PROFILE_INSTRUCTIONS.get(profile, "")
 
-def apply_profile_to_query(query: str, profile: Optional[SearchProfile]) -> str:
+def get_profile_instruction_by_name(name: str) -> str:
+    """Get the instruction string for a profile given by name"""
+    return _INSTRUCTIONS_BY_NAME.get(name, "")
+
+def apply_profile_to_query(query: str, profile: Optional[Union[SearchProfile, str]]) -> str:
     """
     Apply profile-specific instructions to enhance the search query
 
     Args:
         query: Original search query
-        profile: Profile to apply (optional)
+        profile: Profile to apply, as a SearchProfile or its name (optional)
 
     Returns:
         Enhanced query with profile-specific instructions
     """
-    if profile is None:
-        return query
-
-    profile_instruction = get_profile_instruction(profile)
-    if not profile_instruction:
-        return query
-
     # Combine original query with profile-specific instruction
-    enhanced_query = f"{query}. {profile_instruction}"
-    return enhanced_query
+    return query + _SUFFIX_BY_KEY.get(profile, "")
 
 def list_available_profiles() -> Dict[str, str]:
     """Get a list of all available profiles with their descriptions"""
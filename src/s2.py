@@ -1,44 +1,55 @@
-from fastapi import FastAPI, HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI, Header, HTTPException, Response
 from pydantic import BaseModel
+import asyncio
 import httpx
 import json
+import orjson
+import logging
+import os
 import time
 import tiktoken
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 import re
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared Perplexity client and refresh /debug/config on startup; close the client on shutdown"""
+    global _DEBUG_CONFIG_BYTES
+    get_http_client()
+    _DEBUG_CONFIG_BYTES = build_debug_config()
+    yield
+    await close_http_client()
+
 app = FastAPI(
     title="Custom LiteLLM-like Perplexity Proxy",
     description="A LiteLLM-style API proxy for Perplexity AI wrapper. Supports non-streaming /v1/completions and /v1/chat/completions endpoints. This proxy communicates with the main Perplexity server running on port 9522.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-class URLNormalizeMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Log incoming request
-        print(f"🔍 Incoming request: {request.method} {request.url.path}")
-
-        # Fix double slashes in URL path
-        if "//" in request.url.path:
-            # Normalize double slashes to single slashes, but preserve leading slash
-            normalized_path = "/" + "/".join(part for part in request.url.path.split("/") if part)
-            print(f"🔧 Normalizing URL: {request.url.path} -> {normalized_path}")
+class URLNormalizeMiddleware:
+    """Collapse repeated slashes in the request path (e.g. //v1/models) before routing"""
 
-            # Create new URL with normalized path
-            from starlette.datastructures import URL
-            new_url = request.url.replace(path=normalized_path)
-            request._url = new_url
+    def __init__(self, app):
+        self.app = app
 
-        response = await call_next(request)
-        print(f"📤 Response status: {response.status_code}")
-        return response
+    async def __call__(self, scope, receive, send):
+        # Only touch the scope when there is something to fix
+        if scope["type"] == "http" and "//" in scope["path"]:
+            scope["path"] = "/" + "/".join(part for part in scope["path"].split("/") if part)
+        await self.app(scope, receive, send)
 
 # Add the middleware
 app.add_middleware(URLNormalizeMiddleware)
 
 # Perplexity server URL (configured to communicate with existing server on port 9522)
 PERPLEXITY_URL = "http://localhost:9522/api/search/files/stream"
+PERPLEXITY_HEALTH_URL = "http://localhost:9522/api/health"
 
 # Fixed parameters (can be customized later)
 DEFAULT_LANGUAGE = "en-US"
@@ -46,18 +57,111 @@ DEFAULT_INCOGNITO = False
 DEFAULT_RAW_RESPONSE = False
 DEFAULT_SOURCES = "web"  # Comma-separated, e.g., "web,scholar"
 
+# In-process answer cache for repeated one-shot queries; set PROXY_CACHE_ENABLED=false to disable.
+# Single requests can bypass it with a "Cache-Control: no-cache" header.
+CACHE_ENABLED = os.getenv("PROXY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_MAXSIZE = int(os.getenv("PROXY_CACHE_MAXSIZE", "512"))
+CACHE_TTL = float(os.getenv("PROXY_CACHE_TTL", "300"))  # seconds
+
+# Form-encoded forms of the boolean defaults
+_INCOGNITO_FORM_VALUE = str(DEFAULT_INCOGNITO).lower()
+_RAW_RESPONSE_FORM_VALUE = str(DEFAULT_RAW_RESPONSE).lower()
+
+# Patterns used to pull the answer out of the FINAL event, compiled once
+# Matches the nested answer structure: "answer": "{\"answer\": \"actual_content...
+_FINAL_ANSWER_RE = re.compile(r'"answer":\s*"{\s*\\"answer\\":\s*\\"([^"]*(?:\\"[^"]*)*)', re.DOTALL)
+_BROADER_ANSWER_RE = re.compile(r'"answer":\s*"[^"]*"([^"]+)', re.DOTALL)
+_JSON_ARTIFACT_RE = re.compile(r'[{}",\\]')
+_WS_RE = re.compile(r'\s+')
+
+# Shared connection pool for calls to the Perplexity server, opened on startup
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it if startup has not run yet"""
+    global HTTP_CLIENT
+    if HTTP_CLIENT is None:
+        HTTP_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256),
+            timeout=360.0
+        )
+    return HTTP_CLIENT
+
+async def close_http_client():
+    global HTTP_CLIENT
+    if HTTP_CLIENT is not None:
+        await HTTP_CLIENT.aclose()
+        HTTP_CLIENT = None
+
 # Initialize tiktoken encoding for GPT-4
 encoding = tiktoken.encoding_for_model("gpt-4")
 
 # Helper function to count tokens using GPT-4 encoding
 def count_tokens(text: str) -> int:
     """Count tokens in text using GPT-4 encoding"""
-    tokens = encoding.encode(text)
+    # encode_ordinary skips the special-token scan; request text is never meant to carry them
+    tokens = encoding.encode_ordinary(text)
     return len(tokens)
 
+# Count prompt and completion tokens for a usage block
+def count_usage_tokens(prompt: str, completion: str) -> tuple[int, int]:
+    """Count prompt and completion tokens using GPT-4 encoding"""
+    # Two direct calls; encode_ordinary_batch would spin up a thread pool per request
+    return len(encoding.encode_ordinary(prompt)), len(encoding.encode_ordinary(completion))
+
+# Events in the upstream stream are separated by a literal "\n\n" (backslash-n), not by real newlines
+_EVENT_SEPARATOR = '\\n\\n'
+
+def split_sse_block(block: str):
+    """Yield the data payloads found in one raw block of the upstream stream"""
+    # Handle the response which contains literal \n sequences instead of actual newlines
+    # First decode the escaped newlines to actual newlines, then normalize line endings
+    decoded_block = block.replace('\\n', '\n').replace('\\r', '\r')
+    normalized_block = decoded_block.replace('\r\n', '\n').replace('\r', '\n')
+
+    for part in normalized_block.split('\n\n'):
+        part = part.strip()
+        if part.startswith('data: '):
+            yield part[6:].strip()  # Remove 'data: ' prefix
+
+async def iter_sse_events(response: httpx.Response):
+    """Yield data payloads from a streaming upstream response as each block completes"""
+    buffer = ""
+    async for text in response.aiter_text():
+        # Only rescan the tail that could hold a separator split across reads
+        start = max(len(buffer) - len(_EVENT_SEPARATOR) + 1, 0)
+        buffer += text
+        if buffer.find(_EVENT_SEPARATOR, start) < 0:
+            continue
+        *blocks, buffer = buffer.split(_EVENT_SEPARATOR)
+        for block in blocks:
+            for data_str in split_sse_block(block):
+                yield data_str
+    for data_str in split_sse_block(buffer):
+        yield data_str
+
+# Drop an unpaired trailing backslash, left where an answer match stops at an escaped quote
+def _drop_dangling_backslash(text: str) -> str:
+    trailing = len(text) - len(text.rstrip('\\'))
+    return text[:-1] if trailing % 2 else text
+
+# Decode the answer text matched by _FINAL_ANSWER_RE in one pass per escaping level
+def unescape_answer(raw_answer: str) -> str:
+    """Undo the JSON string escaping of an extracted answer, or return it unchanged if malformed"""
+    # split_sse_block turned each escaped "\\n" into a backslash and a real newline; put it back
+    text = raw_answer.replace('\n', '\\n')
+    try:
+        # The answer is a JSON string nested inside another JSON string, so decode twice
+        for _ in range(2):
+            text = orjson.loads('"' + _drop_dangling_backslash(text) + '"')
+    except json.JSONDecodeError:
+        return raw_answer
+    return text
+
 # Model mapping: Parse model name to determine mode and model_preference
 # Example: model="pro-grok4" -> mode="pro", model_preference="grok4"
 # If no prefix, default to "pro"
+@lru_cache(maxsize=128)
 def parse_model(model: str) -> tuple[str, Optional[str]]:
     parts = model.split("-", maxsplit=1)
     if len(parts) == 2:
@@ -70,195 +174,196 @@ def parse_model(model: str) -> tuple[str, Optional[str]]:
         return mode, model_pref
     return "pro", model  # Default to pro mode with model as preference
 
-# Helper to format messages as a single query (for chat/completions)
-def format_messages_as_query(messages: List[Dict[str, str]]) -> str:
-    # Extract just the content without role prefixes
-    formatted = []
-    for msg in messages:
-        content = msg.get("content", "")
-        if content:
-            formatted.append(content)
-    return "\n".join(formatted)
-
 # Import profile support
 try:
     import sys
     import os
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, current_dir)
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
     from perplexity_profiles import validate_profile, apply_profile_to_query
 except ImportError:
     # Profile support not available, will continue without profiles
     validate_profile = None
     apply_profile_to_query = None
 
+# Resolved once so call_perplexity checks a single flag per request
+_PROFILES_AVAILABLE = validate_profile is not None and apply_profile_to_query is not None
+
+# Bounded LRU of (stored_at, answer), keyed on every argument that shapes the upstream request
+_answer_cache: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+
+def _get_cached_answer(key: tuple) -> Optional[str]:
+    entry = _answer_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, answer = entry
+    if time.monotonic() - stored_at > CACHE_TTL:
+        del _answer_cache[key]
+        return None
+    _answer_cache.move_to_end(key)
+    return answer
+
+def _store_cached_answer(key: tuple, answer: str) -> None:
+    _answer_cache[key] = (time.monotonic(), answer)
+    _answer_cache.move_to_end(key)
+    while len(_answer_cache) > CACHE_MAXSIZE:
+        _answer_cache.popitem(last=False)
+
+def _skips_cache(cache_control: Optional[str]) -> bool:
+    """Whether a request's Cache-Control header asks for a fresh answer"""
+    if not cache_control:
+        return False
+    directives = cache_control.lower()
+    return "no-cache" in directives or "no-store" in directives
+
 # Helper to call Perplexity and parse the SSE response for the answer
 async def call_perplexity(query: str, mode: str, model_preference: Optional[str], continue_chat: bool, profile: Optional[str] = None,
                          prompt_source: Optional[str] = None, query_source: Optional[str] = None,
                          should_ask_for_mcp_tool_confirmation: Optional[bool] = None,
-                         search_focus: Optional[str] = None, timezone: Optional[str] = None) -> str:
+                         search_focus: Optional[str] = None, timezone: Optional[str] = None,
+                         use_cache: bool = True) -> str:
+    # Chat requests continue a server-side thread, so only one-shot queries are served from cache
+    cache_key = None
+    if CACHE_ENABLED and use_cache and not continue_chat:
+        cache_key = (mode, model_preference, query, profile, prompt_source, query_source,
+                     should_ask_for_mcp_tool_confirmation, search_focus, timezone)
+        cached_answer = _get_cached_answer(cache_key)
+        if cached_answer is not None:
+            logger.debug("Answer cache hit for query '%.100s'", query)
+            return cached_answer
+
     # Apply profile enhancement if available
     enhanced_query = query
-    if profile and apply_profile_to_query and validate_profile:
+    if profile and _PROFILES_AVAILABLE:
         try:
             search_profile = validate_profile(profile)
             if search_profile:
                 enhanced_query = apply_profile_to_query(query, search_profile)
-                print(f"🎯 Applied profile '{profile}' to query")
+                logger.info("🎯 Applied profile '%s' to query", profile)
             else:
-                print(f"⚠️ Invalid profile '{profile}', using original query")
+                logger.warning("⚠️ Invalid profile '%s', using original query", profile)
         except Exception as e:
-            print(f"⚠️ Error applying profile '{profile}': {e}, using original query")
-
-    async with httpx.AsyncClient() as client:
-        form_data = {
-            "query": enhanced_query,
-            "mode": mode,
-            "model_preference": model_preference if model_preference else "",
-            "incognito": str(DEFAULT_INCOGNITO).lower(),
-            "continue_chat": str(continue_chat).lower(),
-            "raw_response": str(DEFAULT_RAW_RESPONSE).lower(),
-            "language": DEFAULT_LANGUAGE,
-            "sources": DEFAULT_SOURCES,
-        }
+            logger.warning("⚠️ Error applying profile '%s': %s, using original query", profile, e)
+
+    client = get_http_client()
+    form_data = {
+        "query": enhanced_query,
+        "mode": mode,
+        "model_preference": model_preference if model_preference else "",
+        "incognito": _INCOGNITO_FORM_VALUE,
+        "continue_chat": "true" if continue_chat else "false",
+        "raw_response": _RAW_RESPONSE_FORM_VALUE,
+        "language": DEFAULT_LANGUAGE,
+        "sources": DEFAULT_SOURCES,
+    }
 
-        # Add profile to form data if specified
-        if profile:
-            form_data["profile"] = profile
+    # Add profile to form data if specified
+    if profile:
+        form_data["profile"] = profile
 
-        # Add new optional fields if specified
-        if prompt_source:
-            form_data["prompt_source"] = prompt_source
-        if query_source:
-            form_data["query_source"] = query_source
-        if should_ask_for_mcp_tool_confirmation is not None:
-            form_data["should_ask_for_mcp_tool_confirmation"] = str(should_ask_for_mcp_tool_confirmation).lower()
-        if search_focus:
-            form_data["search_focus"] = search_focus
-        if timezone:
-            form_data["timezone"] = timezone
+    # Add new optional fields if specified
+    if prompt_source:
+        form_data["prompt_source"] = prompt_source
+    if query_source:
+        form_data["query_source"] = query_source
+    if should_ask_for_mcp_tool_confirmation is not None:
+        form_data["should_ask_for_mcp_tool_confirmation"] = "true" if should_ask_for_mcp_tool_confirmation else "false"
+    if search_focus:
+        form_data["search_focus"] = search_focus
+    if timezone:
+        form_data["timezone"] = timezone
 
-        files = {}
+    files = {}
 
-        try:
-            response = await client.post(PERPLEXITY_URL, data=form_data, files=files if files else None, timeout=360.0)
+    try:
+        async with client.stream("POST", PERPLEXITY_URL, data=form_data, files=files if files else None, timeout=360.0) as response:
+            if response.is_error:
+                # Read the body so the error handler below can report it
+                await response.aread()
             response.raise_for_status()
 
-            full_response = response.text
-
-
-            # Handle the response which contains literal \n sequences instead of actual newlines
-            # First decode the escaped newlines to actual newlines
-            decoded_response = full_response.replace('\\n', '\n').replace('\\r', '\r')
-
-            # Then normalize line endings
-            normalized_response = decoded_response.replace('\r\n', '\n').replace('\r', '\n')
-
-            # Split on double newlines to get event blocks
-            event_blocks = normalized_response.split('\n\n')
-            filtered_blocks = [block.strip() for block in event_blocks if block.strip()]
-
-            # Extract JSON data from each block that starts with 'data: '
-            events = []
-            for block in filtered_blocks:
-                if block.startswith('data: '):
-                    data_str = block[6:].strip()  # Remove 'data: ' prefix
-                    events.append(data_str)
-
-
-
+            # Events are parsed as they arrive; the stream is dropped once the answer is found
             answer = ""
-            for i, data_str in enumerate(events):
-                print(f"Debug - Event {i} preview: {data_str[:200]}...")
+            i = -1
+            async for data_str in iter_sse_events(response):
+                i += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Event %d preview: %.200s...", i, data_str)
                 if data_str == '[DONE]':
                     break
+                # Only the FINAL event carries the answer; skip JSON-decoding everything else
+                if '"FINAL"' not in data_str:
+                    continue
                 try:
                     # Check if this is a FINAL event by looking for the pattern manually first
                     if '"step_type": "FINAL"' in data_str:
-                        print("\n>>> Debug - Found FINAL chunk (manual detection).")
+                        logger.debug("Found FINAL chunk (manual detection)")
 
                         # Manual extraction approach for malformed JSON
                         # Look for the answer field pattern: "answer": "{\"answer\": \"actual_content..."
-                        import re
-
-                        # Pattern to match the nested answer structure
-                        answer_pattern = r'"answer":\s*"{\s*\\"answer\\":\s*\\"([^"]*(?:\\"[^"]*)*)'
-                        match = re.search(answer_pattern, data_str, re.DOTALL)
+                        match = _FINAL_ANSWER_RE.search(data_str)
 
                         if match:
                             raw_answer = match.group(1)
                             # Clean up the extracted answer
-                            answer = (raw_answer
-                                    .replace('\\"', '"')
-                                    .replace('\\\\', '\\')
-                                    .replace('\\n', '\n')
-                                    .replace('\\t', '\t')
-                                    .replace('\\r', '\r')
-                                    .replace('\\/', '/')
-                                    .replace('\\u2014', '—')
-                                    .replace('\\u2019', "'")
-                                    .replace('\\u201c', '"')
-                                    .replace('\\u201d', '"')
-                                    .replace('\\u2013', '–')
-                                    .replace('\\u2018', "'")
-                                    .replace('\\u2026', '…')
-                                    .replace('\\u00a0', ' ')
-                                    .strip())
+                            answer = unescape_answer(raw_answer).strip()
 
                             if answer and len(answer) > 10:  # Basic sanity check
-                                print(f"Debug - Manual extraction successful: '{answer[:100]}...'")
+                                logger.debug("Manual extraction successful: '%.100s...'", answer)
                                 break
 
                         # Fallback: try broader pattern matching
-                        broader_pattern = r'"answer":\s*"[^"]*"([^"]+)'
-                        broader_match = re.search(broader_pattern, data_str, re.DOTALL)
+                        broader_match = _BROADER_ANSWER_RE.search(data_str)
                         if broader_match:
                             raw_content = broader_match.group(1)
                             # Extract readable text, removing JSON artifacts
-                            clean_content = re.sub(r'[{}",\\]', ' ', raw_content)
-                            clean_content = re.sub(r'\s+', ' ', clean_content).strip()
+                            clean_content = _JSON_ARTIFACT_RE.sub(' ', raw_content)
+                            clean_content = _WS_RE.sub(' ', clean_content).strip()
 
                             if len(clean_content) > 50:  # Must be substantial content
                                 answer = clean_content
-                                print(f"Debug - Fallback extraction successful: '{answer[:100]}...'")
+                                logger.debug("Fallback extraction successful: '%.100s...'", answer)
                                 break
 
                     # Fallback to normal JSON parsing for non-FINAL events
                     try:
-                        chunk = json.loads(data_str)
+                        chunk = orjson.loads(data_str)
                         if chunk.get("type") == "chunk" and chunk.get("data", {}).get("step_type") == "FINAL":
-                            print("\n>>> Debug - Found FINAL chunk via JSON parsing.")
+                            logger.debug("Found FINAL chunk via JSON parsing")
                             final_content = chunk.get("data", {}).get("content", {})
                             answer_json_str = final_content.get("answer", "")
 
                             if answer_json_str:
                                 try:
-                                    answer_data = json.loads(answer_json_str)
+                                    answer_data = orjson.loads(answer_json_str)
                                     answer = answer_data.get("answer", "")
                                     if answer:
-                                        print(f"Debug - JSON parsing successful: '{answer[:100]}...'")
+                                        logger.debug("JSON parsing successful: '%.100s...'", answer)
                                         break
                                 except json.JSONDecodeError:
-                                    print("Debug - Nested JSON failed, already handled above")
+                                    logger.debug("Nested JSON failed, already handled above")
                     except json.JSONDecodeError:
                         # Skip non-FINAL events that fail JSON parsing
                         continue
 
                 except json.JSONDecodeError as e:
-                    print(f"Debug - Error decoding JSON from event: {e}")
-                    print(f"Debug - Problematic data string (first 300 chars): {data_str[:300]}")
+                    logger.debug("Error decoding JSON from event: %s", e)
+                    logger.debug("Problematic data string (first 300 chars): %.300s", data_str)
                     continue
 
-            if not answer:
+        if not answer:
 
-                raise ValueError("No valid answer found in the response")
+            raise ValueError("No valid answer found in the response")
 
-            return answer
+        if cache_key is not None:
+            _store_cached_answer(cache_key, answer)
+        return answer
 
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail=f"Perplexity API error: {e.response.text}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"Perplexity API error: {e.response.text}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 # Pydantic models for OpenAI-like requests following Chat Completions API structure
 from pydantic import Field, field_validator
@@ -332,6 +437,9 @@ class CompletionRequest(BaseModel):
     @classmethod
     def validate_prompt(cls, v):
         """Convert prompt to string if needed"""
+        # Plain string prompts are by far the most common, so return them first
+        if isinstance(v, str):
+            return v
         if isinstance(v, list):
             if all(isinstance(item, str) for item in v):
                 return "\n".join(v)
@@ -381,13 +489,15 @@ class ChatCompletionRequest(BaseModel):
 
         # More flexible validation - allow any role sequence
         for msg in v:
-            if msg.role == MessageRole.assistant and msg.tool_calls and not msg.content:
+            # Compare the plain string value rather than going through Enum __eq__
+            role = msg.role.value
+            if role == "assistant" and msg.tool_calls and not msg.content:
                 # Assistant message with tool calls but no content is valid
                 continue
-            if msg.role == MessageRole.tool and not msg.tool_call_id:
+            if role == "tool" and not msg.tool_call_id:
                 raise ValueError("Tool messages must have tool_call_id")
-            if msg.role in [MessageRole.system, MessageRole.user, MessageRole.assistant] and not msg.content and not msg.tool_calls:
-                raise ValueError(f"{msg.role} messages must have content or tool_calls")
+            if role in ("system", "user", "assistant") and not msg.content and not msg.tool_calls:
+                raise ValueError(f"{role} messages must have content or tool_calls")
 
         return v
 
@@ -425,44 +535,41 @@ class ChatCompletionRequest(BaseModel):
 
 # /v1/completions endpoint (generation, continue_chat=false)
 @app.post("/v1/completions")
-async def completions(request: CompletionRequest):
-    print(f"\n=== COMPLETIONS REQUEST ===")
-    print(f"Model: {request.model}")
-    print(f"Prompt: '{request.prompt}'")
-    print(f"Max tokens: {request.max_tokens}")
-    print(f"Temperature: {request.temperature}")
-    print(f"Profile: {request.profile}")
-    print(f"Prompt source: {request.prompt_source}")
-    print(f"Query source: {request.query_source}")
-    print(f"Should ask for MCP tool confirmation: {request.should_ask_for_mcp_tool_confirmation}")
-    print(f"Search focus: {request.search_focus}")
-    print(f"Timezone: {request.timezone}")
-    print(f"========================\n")
+async def completions(request: CompletionRequest, cache_control: Optional[str] = Header(None)):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Completions request: model=%s prompt=%r max_tokens=%s temperature=%s profile=%s "
+            "prompt_source=%s query_source=%s should_ask_for_mcp_tool_confirmation=%s search_focus=%s timezone=%s",
+            request.model, request.prompt, request.max_tokens, request.temperature, request.profile,
+            request.prompt_source, request.query_source, request.should_ask_for_mcp_tool_confirmation,
+            request.search_focus, request.timezone
+        )
 
     mode, model_preference = parse_model(request.model)
     query = request.prompt
 
-    print(f"Parsed - Mode: '{mode}', Model Preference: '{model_preference}'")
-    print(f"Final Query sent to Perplexity: '{query}'\n")
+    logger.debug("Parsed - Mode: '%s', Model Preference: '%s'", mode, model_preference)
+    logger.debug("Final Query sent to Perplexity: %r", query)
 
     answer = await call_perplexity(query=query, mode=mode, model_preference=model_preference, continue_chat=False,
                                   profile=request.profile, prompt_source=request.prompt_source,
                                   query_source=request.query_source,
                                   should_ask_for_mcp_tool_confirmation=request.should_ask_for_mcp_tool_confirmation,
-                                  search_focus=request.search_focus, timezone=request.timezone)
+                                  search_focus=request.search_focus, timezone=request.timezone,
+                                  use_cache=not _skips_cache(cache_control))
 
 
 
     # Count tokens using GPT-4 encoding
-    prompt_tokens = count_tokens(query)
-    completion_tokens = count_tokens(answer)
+    prompt_tokens, completion_tokens = count_usage_tokens(query, answer)
     total_tokens = prompt_tokens + completion_tokens
 
     # Format as OpenAI completions response
+    now = int(time.time())
     return {
-        "id": f"cmpl-{int(time.time())}",
+        "id": f"cmpl-{now}",
         "object": "text_completion",
-        "created": int(time.time()),
+        "created": now,
         "model": request.model,
         "choices": [
             {
@@ -482,28 +589,24 @@ async def completions(request: CompletionRequest):
 # /v1/chat/completions endpoint (chat, continue_chat=true)
 @app.post("/v1/chat/completions")
 async def chat_completions(request: ChatCompletionRequest):
-    print(f"\n=== CHAT COMPLETIONS REQUEST ===")
-    print(f"Model: {request.model}")
-    print(f"Messages ({len(request.messages)}):")
-    for i, msg in enumerate(request.messages):
-        print(f"  [{i}] {msg.role}: '{msg.content}'")
-    print(f"Max tokens: {request.max_tokens}")
-    print(f"Temperature: {request.temperature}")
-    print(f"Profile: {request.profile}")
-    print(f"Prompt source: {request.prompt_source}")
-    print(f"Query source: {request.query_source}")
-    print(f"Should ask for MCP tool confirmation: {request.should_ask_for_mcp_tool_confirmation}")
-    print(f"Search focus: {request.search_focus}")
-    print(f"Timezone: {request.timezone}")
-    print(f"==============================\n")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Chat completions request: model=%s messages=%d max_tokens=%s temperature=%s profile=%s "
+            "prompt_source=%s query_source=%s should_ask_for_mcp_tool_confirmation=%s search_focus=%s timezone=%s",
+            request.model, len(request.messages), request.max_tokens, request.temperature, request.profile,
+            request.prompt_source, request.query_source, request.should_ask_for_mcp_tool_confirmation,
+            request.search_focus, request.timezone
+        )
+        for i, msg in enumerate(request.messages):
+            logger.debug("  [%d] %s: %r", i, msg.role.value, msg.content)
 
     mode, model_preference = parse_model(request.model)
 
     # Convert messages to query
-    query = format_messages_as_query([msg.model_dump() for msg in request.messages])
+    query = "\n".join(msg.content for msg in request.messages if msg.content)
 
-    print(f"Parsed - Mode: '{mode}', Model Preference: '{model_preference}'")
-    print(f"Final Query sent to Perplexity: '{query}'\n")
+    logger.debug("Parsed - Mode: '%s', Model Preference: '%s'", mode, model_preference)
+    logger.debug("Final Query sent to Perplexity: %r", query)
 
     answer = await call_perplexity(query=query, mode=mode, model_preference=model_preference, continue_chat=True,
                                   profile=request.profile, prompt_source=request.prompt_source,
@@ -514,15 +617,15 @@ async def chat_completions(request: ChatCompletionRequest):
 
 
     # Count tokens using GPT-4 encoding
-    prompt_tokens = count_tokens(query)
-    completion_tokens = count_tokens(answer)
+    prompt_tokens, completion_tokens = count_usage_tokens(query, answer)
     total_tokens = prompt_tokens + completion_tokens
 
     # Format as OpenAI chat completions response
+    now = int(time.time())
     return {
-        "id": f"chatcmpl-{int(time.time())}",
+        "id": f"chatcmpl-{now}",
         "object": "chat.completion",
-        "created": int(time.time()),
+        "created": now,
         "model": request.model,
         "choices": [
             {
@@ -541,160 +644,126 @@ async def chat_completions(request: ChatCompletionRequest):
         }
     }
 
+# Model ids advertised by /api/tags and /v1/models; the payloads never change, so build them once
+_PRO_MODEL_IDS = (
+    "pro-sonar",
+    "pro-claude37sonnetthinking",
+    "pro-grok4",
+    "pro-claude45sonnet",
+    "pro-claude45sonnetthinking",
+    "pro-gpt5",
+    "pro-gpt5thinking",
+)
+_MODEL_IDS = _PRO_MODEL_IDS + ("deep-research", "lab-beta")
+_MODELS_CREATED = int(time.time())
+
+_TAGS_RESPONSE = {
+    "models": [{"name": model_id, "model": model_id, "size": 0} for model_id in _PRO_MODEL_IDS]
+}
+
+_MODELS_RESPONSE = {
+    "object": "list",
+    "data": [
+        {
+            "id": model_id,
+            "object": "model",
+            "created": _MODELS_CREATED,
+            "owned_by": "perplexity",
+            "permission": [],
+            "root": model_id,
+            "parent": None
+        }
+        for model_id in _MODEL_IDS
+    ]
+}
+
 # Optional: Add /api/tags endpoint to handle those 404 requests
 @app.get("/api/tags")
 async def get_tags():
     """Dummy endpoint to handle requests from tools expecting Ollama-style API"""
-    return {
-        "models": [
-            {"name": "pro-sonar", "model": "pro-sonar", "size": 0},
-            {"name": "pro-claude37sonnetthinking", "model": "pro-claude37sonnetthinking", "size": 0},
-            {"name": "pro-grok4", "model": "pro-grok4", "size": 0},
-            {"name": "pro-claude45sonnet", "model": "pro-claude45sonnet", "size": 0},
-            {"name": "pro-claude45sonnetthinking", "model": "pro-claude45sonnetthinking", "size": 0},
-            {"name": "pro-gpt5", "model": "pro-gpt5", "size": 0},
-            {"name": "pro-gpt5thinking", "model": "pro-gpt5thinking", "size": 0}
-        ]
-    }
+    return _TAGS_RESPONSE
 
 @app.get("/v1/models")
 async def list_models():
     """OpenAI-compatible models endpoint"""
-    return {
-        "object": "list",
-        "data": [
-            {
-                "id": "pro-sonar",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-sonar",
-                "parent": None
-            },
-            {
-                "id": "pro-claude37sonnetthinking",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-claude37sonnetthinking",
-                "parent": None
-            },
-            {
-                "id": "pro-grok4",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-grok4",
-                "parent": None
-            },
-            {
-                "id": "pro-claude45sonnet",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-claude45sonnet",
-                "parent": None
-            },
-            {
-                "id": "pro-claude45sonnetthinking",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-claude45sonnetthinking",
-                "parent": None
-            },
-            {
-                "id": "pro-gpt5",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-gpt5",
-                "parent": None
-            },
-            {
-                "id": "pro-gpt5thinking",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "pro-gpt5thinking",
-                "parent": None
-            },
-            {
-                "id": "deep-research",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "deep-research",
-                "parent": None
-            },
-            {
-                "id": "lab-beta",
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "perplexity",
-                "permission": [],
-                "root": "lab-beta",
-                "parent": None
-            }
-        ]
-    }
-
-@app.get("//v1/models")
-async def list_models_double_slash():
-    """OpenAI-compatible models endpoint (double-slash version)"""
-    return await list_models()
-
-@app.post("//v1/chat/completions")
-async def chat_completions_double_slash(request: ChatCompletionRequest):
-    """OpenAI-compatible chat completions endpoint (double-slash version)"""
-    return await chat_completions(request)
+    return _MODELS_RESPONSE
+
+# Health probes within this many seconds share one upstream check
+HEALTH_CACHE_TTL = 1.0
+# Holds the serialized result; every request gets its own Response built from it
+_health_cache: Dict[str, Any] = {"ts": 0.0, "status_code": 503, "body": b""}
+_health_lock: Optional[asyncio.Lock] = None
+
+# Upstream status codes that count as a successful probe
+_HEALTHY_CODES = frozenset({200, 201})
+
+# Fixed parts of the payloads reported when the Perplexity server answers or cannot be reached
+_HEALTHY_TEMPLATE = {
+    "status": "healthy",
+    "proxy_server": "running",
+    "perplexity_server": "connected"
+}
+_UNHEALTHY_TEMPLATE = {
+    "status": "unhealthy",
+    "proxy_server": "running",
+    "perplexity_server": "disconnected"
+}
+
+async def probe_perplexity() -> Dict[str, Any]:
+    """Check connectivity to the Perplexity server"""
+    try:
+        client = get_http_client()
+        # Probe the server's own health route; FastAPI answers HEAD with 405, so use a body-light GET
+        response = await client.get(PERPLEXITY_HEALTH_URL, timeout=2.0)
+
+        # Body status and HTTP code both follow this one check
+        if response.status_code in _HEALTHY_CODES:
+            payload = _HEALTHY_TEMPLATE.copy()
+        else:
+            payload = _UNHEALTHY_TEMPLATE.copy()
+            payload["perplexity_server"] = "error"
+        payload["perplexity_status_code"] = response.status_code
+        # Whole seconds from the integer clock; cached results keep this fill-time value
+        payload["timestamp"] = time.time_ns() // 1_000_000_000
+        return payload
+    except Exception as e:
+        payload = _UNHEALTHY_TEMPLATE.copy()
+        payload["error"] = repr(e)
+        payload["timestamp"] = time.time_ns() // 1_000_000_000
+        return payload
+
+def store_health_result(data: Dict[str, Any]) -> None:
+    """Cache a serialized probe result, with 503 unless the Perplexity server is connected"""
+    _health_cache["status_code"] = 200 if data["perplexity_server"] == "connected" else 503
+    _health_cache["body"] = orjson.dumps(data)
+    _health_cache["ts"] = time.monotonic()
+
+def cached_health_response() -> Response:
+    """Build a fresh Response from the cached health result"""
+    return Response(content=_health_cache["body"], status_code=_health_cache["status_code"],
+                    media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify proxy and Perplexity server connectivity"""
-    try:
-        async with httpx.AsyncClient() as client:
-            # Test connection to Perplexity server with a simple request
-            response = await client.post(
-                PERPLEXITY_URL,
-                json={
-                    "query": "test",
-                    "language": DEFAULT_LANGUAGE,
-                    "incognito": DEFAULT_INCOGNITO,
-                    "raw_response": DEFAULT_RAW_RESPONSE,
-                    "sources": DEFAULT_SOURCES
-                },
-                timeout=5.0
-            )
-
-            return {
-                "status": "healthy",
-                "proxy_server": "running",
-                "perplexity_server": "connected" if response.status_code in [200, 201] else "error",
-                "perplexity_status_code": response.status_code,
-                "timestamp": int(time.time())
-            }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "proxy_server": "running",
-            "perplexity_server": "disconnected",
-            "error": str(e),
-            "timestamp": int(time.time())
-        }
-
-@app.get("/debug/config")
-async def debug_config():
-    """Debug endpoint to show current configuration"""
-    return {
+    global _health_lock
+    if time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL:
+        return cached_health_response()
+
+    if _health_lock is None:
+        _health_lock = asyncio.Lock()
+
+    async with _health_lock:
+        # Another probe may have refreshed the cache while this one waited
+        if time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL:
+            return cached_health_response()
+        # The serialized result is cached so repeat probes skip the upstream call and the encode
+        store_health_result(await probe_perplexity())
+        return cached_health_response()
+
+# The configuration only changes between restarts, so it is serialized once per startup instead of per request
+def build_debug_config() -> bytes:
+    return orjson.dumps({
         "perplexity_url": PERPLEXITY_URL,
         "default_language": DEFAULT_LANGUAGE,
         "default_incognito": DEFAULT_INCOGNITO,
@@ -705,12 +774,22 @@ async def debug_config():
             "version": app.version,
             "description": app.description
         }
-    }
+    })
+
+# Rebuilt by lifespan on startup
+_DEBUG_CONFIG_BYTES = build_debug_config()
+
+@app.get("/debug/config")
+async def debug_config():
+    """Debug endpoint to show current configuration"""
+    return Response(content=_DEBUG_CONFIG_BYTES, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    print("🚀 Starting LiteLLM-style Perplexity Proxy Server...")
-    print("📡 This proxy communicates with the main Perplexity server on port 9522")
-    print("🌐 LiteLLM-compatible endpoints available on port 4000")
-    print("📚 API Documentation: http://localhost:4000/docs")
-    uvicorn.run(app, host="0.0.0.0", port=4000)  # Run on port 4000, like LiteLLM example
+    logging.basicConfig(level=logging.INFO)
+    logger.info("🚀 Starting LiteLLM-style Perplexity Proxy Server on :4000 -> %s (docs: http://localhost:4000/docs)", PERPLEXITY_URL)
+    # loop/http "auto" select uvloop and httptools when installed (uvicorn[standard]), except on Windows
+    # Multiple workers need the app as an import string; each worker keeps its own caches and client pool
+    workers = min(os.cpu_count() or 1, 4)
+    uvicorn.run("s2:app", host="0.0.0.0", port=4000, loop="auto", http="auto", workers=workers,
+                backlog=4096, limit_concurrency=2048)  # Run on port 4000, like LiteLLM example
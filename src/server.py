@@ -5,15 +5,21 @@ A FastAPI web server for the Perplexity AI client with REST API and web interfac
 """
 
 import asyncio
+import gzip
+import hashlib
 import json
+import orjson
 import os
 import sys
 import time
+from contextlib import asynccontextmanager
+from types import MappingProxyType
 from typing import Dict, List, Optional, Union
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, File, UploadFile, Form
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, File, UploadFile, Form, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 import uvicorn
 
@@ -21,11 +27,16 @@ import uvicorn
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from perplexity_api import PerplexityAPI, SearchMode, ProModel, ReasoningModel, SearchSource, PerplexityAPIError
+from perplexity_api import PerplexityAPI, SearchMode, ProModel, ReasoningModel, SearchSource, PerplexityAPIError, load_json_cached
 from perplexity_profiles import SearchProfile, validate_profile, list_available_profiles
 
+# Path that cookies were last loaded from, tried first on later calls
+_cookie_path: Optional[str] = None
+
 def load_cookies_from_file() -> Dict[str, str]:
     """Load cookies from JSON file using path from .example.env"""
+    global _cookie_path
+
     # Try multiple possible paths for cookies.json
     possible_paths = [
         "cookies.json",  # Current directory
@@ -33,28 +44,42 @@ def load_cookies_from_file() -> Dict[str, str]:
         "../cookies.json",  # Parent directory
         "/home/mewtwo/Zykairotis/Perplexity-claude/cookies.json",  # Original path
     ]
+    if _cookie_path:
+        possible_paths.insert(0, _cookie_path)
 
     for cookie_path in possible_paths:
         try:
-            with open(cookie_path, 'r') as f:
-                cookie_data = json.load(f)
-                cookies = cookie_data.get('cookies', {})
-                if cookies:
+            # Parsed data is reused until the file's mtime or size changes
+            cookie_data = load_json_cached(cookie_path)
+            cookies = cookie_data.get('cookies', {})
+            if cookies:
+                if cookie_path != _cookie_path:
                     print(f"✅ Loaded {len(cookies)} cookies from {cookie_path}")
-                    return cookies
-                else:
-                    print(f"⚠️ No cookies found in {cookie_path}")
+                    _cookie_path = cookie_path
+                return dict(cookies)
+            else:
+                print(f"⚠️ No cookies found in {cookie_path}")
         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
             continue
 
     print(f"⚠️ Could not load cookies from any of the attempted paths: {possible_paths}")
     return {}
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the Redis connection pool on shutdown"""
+    yield
+    if redis_client is not None:
+        # aclose() is the redis>=5 spelling; older clients only have close()
+        close = getattr(redis_client, "aclose", None) or redis_client.close
+        await close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Perplexity AI API Server",
     description="Web server for Perplexity AI with REST API and streaming support",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -66,9 +91,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Paths that skip compression: streamed results must reach the client chunk by chunk,
+# and the home page already serves its own gzipped bytes
+_UNCOMPRESSED_PATHS = frozenset({"/", "/api/search/files", "/api/search/files/stream"})
+
+class SelectiveGZipMiddleware:
+    """Gzip HTTP responses except on the paths in _UNCOMPRESSED_PATHS"""
+
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, **gzip_options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in _UNCOMPRESSED_PATHS:
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+# Compress JSON API responses large enough to benefit
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Default cookies (PLACEHOLDER - Load from cookies.json file)
 # These are fallback values only and won't work without real authentication cookies
-DEFAULT_COOKIES = {
+# Read-only view; get_api hands the client its own copy
+DEFAULT_COOKIES = MappingProxyType({
     'pplx.visitor-id': 'your-visitor-id',
     'pplx.source-selection-v3-space-': '[]',
     '__stripe_mid': 'your-stripe-mid',
@@ -92,7 +138,7 @@ DEFAULT_COOKIES = {
     'AWSALBCORS': 'your-aws-alb-cors-cookie',
     '_dd_s': 'your-datadog-session',
     'pplx.metadata': '{%22qc%22:0}',
-}
+})
 
 # Pydantic models for request/response
 class FollowUpData(BaseModel):
@@ -159,9 +205,50 @@ class CreateSpaceRequest(BaseModel):
     access: int = 1
     auto_save: bool = False
 
+# Optional Redis backend so every worker sees the same conversation tokens
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+REDIS_URL = os.getenv("REDIS_URL")
+CONVERSATION_KEY = "conv:default"
+CONVERSATION_TTL = 3600  # seconds a conversation can be continued after its last update
+
 # Global API instance and conversation storage
 api_instance = None
-conversation_storage = {}  # Simple in-memory storage for conversation tokens
+redis_client = aioredis.from_url(REDIS_URL, decode_responses=True) if REDIS_URL and aioredis else None
+conversation_storage = {}  # In-memory fallback for conversation tokens when Redis is not configured
+_conversation_expires_at = 0.0
+
+async def load_conversation() -> Dict[str, str]:
+    """Return the stored conversation tokens, or an empty dict if none are live"""
+    if redis_client is not None:
+        try:
+            return await redis_client.hgetall(CONVERSATION_KEY)
+        except Exception as e:
+            print(f"⚠️ Could not read conversation tokens from Redis: {e}")
+            return {}
+
+    if time.monotonic() > _conversation_expires_at:
+        conversation_storage.clear()
+    return dict(conversation_storage)
+
+async def save_conversation(tokens: Dict[str, str]) -> None:
+    """Store conversation tokens and restart their expiry"""
+    global _conversation_expires_at
+    if redis_client is not None:
+        try:
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.hset(CONVERSATION_KEY, mapping=tokens)
+            pipe.expire(CONVERSATION_KEY, CONVERSATION_TTL)
+            await pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Could not store conversation tokens in Redis: {e}")
+        return
+
+    conversation_storage.update(tokens)
+    _conversation_expires_at = time.monotonic() + CONVERSATION_TTL
 
 async def get_api():
     """Get or create API instance"""
@@ -171,15 +258,12 @@ async def get_api():
         cookies = load_cookies_from_file()
         if not cookies:
             print("🔄 Using fallback DEFAULT_COOKIES")
-            cookies = DEFAULT_COOKIES
+            cookies = dict(DEFAULT_COOKIES)
         api_instance = PerplexityAPI(cookies)
     return api_instance
 
-# Routes
-@app.get("/", response_class=HTMLResponse)
-async def home():
-    """Serve the main web interface"""
-    return """
+# Main web interface, encoded and compressed once at import
+HOME_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -842,6 +926,45 @@ async def home():
     </html>
     """
 
+_HOME_HTML_BYTES = HOME_HTML.encode("utf-8")
+_HOME_HTML_GZIP = gzip.compress(_HOME_HTML_BYTES, compresslevel=9, mtime=0)
+_HOME_ETAG = '"' + hashlib.blake2b(_HOME_HTML_BYTES, digest_size=16).hexdigest() + '"'
+# no-cache still lets browsers keep the page, but they revalidate so a restart with new HTML is picked up
+_HOME_HEADERS = {"etag": _HOME_ETAG, "cache-control": "no-cache", "vary": "Accept-Encoding"}
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Return True if an Accept-Encoding header allows gzip with a non-zero q-value"""
+    wildcard = False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        # An explicit gzip entry wins over the wildcard
+        if coding == "gzip":
+            return q > 0
+        wildcard = q > 0
+    return wildcard
+
+# Routes
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    """Serve the main web interface"""
+    if _HOME_ETAG in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=_HOME_HEADERS)
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        return Response(content=_HOME_HTML_GZIP, media_type="text/html",
+                        headers={**_HOME_HEADERS, "content-encoding": "gzip"})
+    return HTMLResponse(content=_HOME_HTML_BYTES, headers=_HOME_HEADERS)
+
 
 
 @app.post("/api/search", response_model=Union[SearchResponse, Dict])
@@ -884,21 +1007,25 @@ async def api_search(request: SearchRequest):
             space=request.space
         )
         
+        # The raw upstream payload can hold anything, so it keeps FastAPI's encoder
         if request.raw_response:
             return result
         
-        return SearchResponse(
-            query=result.query,
-            answer=result.answer,
-            sources=result.sources,
-            mode=result.mode,
-            model=result.model,
-            language=result.language,
-            timestamp=result.timestamp,
-            backend_uuid=result.backend_uuid,
-            context_uuid=result.context_uuid,
-            related_queries=result.related_queries or []
-        )
+        # Returning a Response skips FastAPI's re-validation of the response model,
+        # which only documents the shape built here
+        payload = {
+            "query": result.query,
+            "answer": result.answer,
+            "sources": result.sources,
+            "mode": result.mode,
+            "model": result.model,
+            "language": result.language,
+            "timestamp": result.timestamp,
+            "backend_uuid": result.backend_uuid,
+            "context_uuid": result.context_uuid,
+            "related_queries": result.related_queries or []
+        }
+        return Response(content=orjson.dumps(payload, default=str), media_type="application/json")
         
     except PerplexityAPIError as e:
         raise HTTPException(status_code=400, detail=f"API Error: {str(e)}")
@@ -1037,16 +1164,17 @@ async def api_search_with_files_stream(
         
         if continue_chat:
             # Auto-use stored conversation tokens
-            global conversation_storage
-            if 'backend_uuid' in conversation_storage and 'read_write_token' in conversation_storage:
+            conversation = await load_conversation()
+            if 'backend_uuid' in conversation and 'read_write_token' in conversation:
                 follow_up_dict = {
-                    'backend_uuid': conversation_storage['backend_uuid'],
-                    'read_write_token': conversation_storage['read_write_token'],
+                    'backend_uuid': conversation['backend_uuid'],
+                    'read_write_token': conversation['read_write_token'],
                     'attachments': []
                 }
         
         # Return Server-Sent Events stream
         async def generate_stream():
+            stored_tokens = {}
             try:
                 status_msg = f"Processing {len(uploaded_files)} files..."
                 if follow_up_dict:
@@ -1072,6 +1200,7 @@ async def api_search_with_files_stream(
                 ):
                     # Extract and store conversation tokens automatically
                     raw_data = chunk.to_dict() if hasattr(chunk, 'to_dict') else chunk.__dict__
+                    found_tokens = {}
                     
                     # Look for tokens in the raw_data field (which contains the original response)
                     if 'raw_data' in raw_data and raw_data['raw_data']:
@@ -1079,18 +1208,23 @@ async def api_search_with_files_stream(
                         
                         # Store tokens for future continue_chat usage
                         if 'backend_uuid' in original_response and original_response['backend_uuid']:
-                            conversation_storage['backend_uuid'] = original_response['backend_uuid']
-                            print(f"🔑 Stored backend_uuid: {original_response['backend_uuid']}")
+                            found_tokens['backend_uuid'] = original_response['backend_uuid']
                         
                         if 'read_write_token' in original_response and original_response['read_write_token']:
-                            conversation_storage['read_write_token'] = original_response['read_write_token']
-                            print(f"🔑 Stored read_write_token: {original_response['read_write_token']}")
+                            found_tokens['read_write_token'] = original_response['read_write_token']
                     
                     # Also check top level (fallback)
                     if 'backend_uuid' in raw_data and raw_data['backend_uuid']:
-                        conversation_storage['backend_uuid'] = raw_data['backend_uuid']
+                        found_tokens['backend_uuid'] = raw_data['backend_uuid']
                     if 'read_write_token' in raw_data and raw_data['read_write_token']:
-                        conversation_storage['read_write_token'] = raw_data['read_write_token']
+                        found_tokens['read_write_token'] = raw_data['read_write_token']
+                    
+                    # Most chunks repeat the same tokens; only write when they change
+                    if found_tokens and found_tokens.items() - stored_tokens.items():
+                        stored_tokens.update(found_tokens)
+                        await save_conversation(found_tokens)
+                        for name, value in found_tokens.items():
+                            print(f"🔑 Stored {name}: {value}")
                     
                     if raw_response:
                         # Return formatted raw chunk data for better readability
@@ -1150,6 +1284,11 @@ async def api_search_with_files_stream(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stream setup failed: {str(e)}")
 
+async def send_ws_message(websocket: WebSocket, message: Dict) -> None:
+    """Send a message as a JSON text frame encoded with orjson"""
+    # Text rather than binary frames, since the web client JSON.parses event.data
+    await websocket.send_text(orjson.dumps(message).decode())
+
 @app.websocket("/ws/search")
 async def websocket_search(websocket: WebSocket):
     await websocket.accept()
@@ -1174,11 +1313,11 @@ async def websocket_search(websocket: WebSocket):
             search_profile = validate_profile(profile)
             if search_profile is None:
                 available_profiles = list(list_available_profiles().keys())
-                await websocket.send_json({"type": "error", "data": {"error": f"Invalid profile '{profile}'. Available profiles: {available_profiles}"}})
+                await send_ws_message(websocket, {"type": "error", "data": {"error": f"Invalid profile '{profile}'. Available profiles: {available_profiles}"}})
                 return
 
         try:
-            await websocket.send_json({"type": "status", "data": {"status": f"Starting search: {query}"}})
+            await send_ws_message(websocket, {"type": "status", "data": {"status": f"Starting search: {query}"}})
 
             # Use the search_stream method
             async for chunk in api.search_stream(
@@ -1195,7 +1334,7 @@ async def websocket_search(websocket: WebSocket):
                 space=space
             ):
                 # Send the chunk data
-                await websocket.send_json({
+                await send_ws_message(websocket, {
                     "type": "chunk",
                     "data": {
                         "step_type": chunk.step_type,
@@ -1204,19 +1343,19 @@ async def websocket_search(websocket: WebSocket):
                     }
                 })
             
-            await websocket.send_json({"type": "status", "data": {"status": "Stream completed"}})
+            await send_ws_message(websocket, {"type": "status", "data": {"status": "Stream completed"}})
 
         except PerplexityAPIError as e:
-            await websocket.send_json({"type": "error", "data": {"error": str(e)}})
+            await send_ws_message(websocket, {"type": "error", "data": {"error": str(e)}})
         except Exception as e:
-            await websocket.send_json({"type": "error", "data": {"error": f"Stream failed: {str(e)}"}})
+            await send_ws_message(websocket, {"type": "error", "data": {"error": f"Stream failed: {str(e)}"}})
 
     except WebSocketDisconnect:
         print("Client disconnected")
     except Exception as e:
         # Attempt to send an error message before closing
         try:
-            await websocket.send_json({"type": "error", "data": {"error": f"An unexpected error occurred: {str(e)}"}})
+            await send_ws_message(websocket, {"type": "error", "data": {"error": f"An unexpected error occurred: {str(e)}"}})
         except Exception:
             pass # Ignore if sending fails because the socket is already closed
 
@@ -1338,5 +1477,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # "auto" selects uvloop and httptools when installed (uvicorn[standard]), except on Windows
+        loop="auto",
+        http="auto",
+        access_log=False
     )
\ No newline at end of file